@@ -144,3 +144,53 @@ AUTH_USER_MODEL = 'accounts.User'
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'accounts:dashboard_redirect'
 LOGOUT_REDIRECT_URL = 'home'
+
+# ML inference
+# Load the salary regression model in a background thread at process start
+ML_SALARY_MODEL_WARMUP = False
+# Prediction result cache; set BACKEND to a CACHES alias to share entries between workers
+ML_PREDICTION_CACHE = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1024,
+    'TTL_SECONDS': 3600,
+    'BACKEND': None,
+}
+# Token for service clients of the JSON prediction API (Authorization: Bearer <token>). Calls without it
+# get the login/role checks of the matching HTML pages and at most 100 inputs per batch
+ML_API_TOKEN = None
+# Coalesce concurrent single-row classifier calls (campaign, health) into one batch per model
+ML_MICROBATCH = {
+    'ENABLED': False,
+    'MAX_BATCH_SIZE': 32,
+    'MAX_WAIT_MS': 2,
+}
+# Thread pool that runs models for the async prediction views; requests beyond MAX_QUEUE get a 503
+ML_INFERENCE_EXECUTOR = {
+    'MAX_WORKERS': None,  # os.cpu_count()
+    'MAX_QUEUE': 64,
+}
+# Where pipeline models run: 'inline' (this process) or 'process' (worker pool fed through shared memory)
+ML_INFERENCE_BACKEND = {
+    'BACKEND': 'inline',
+    'MAX_WORKERS': None,  # os.cpu_count()
+    'START_METHOD': 'forkserver',
+    'PRELOAD': [],  # registered model names to load when each worker starts
+    'SHM_MIN_ROWS': 2000,  # smaller batches are pickled (see the benchmark_transport command)
+}
+# Evaluate small batches of the XGBoost models with NumPy tree arrays; enabled per model only if verified bit for bit
+ML_COMPILED_TREES = {
+    'ENABLED': False,
+    'MAX_ROWS': 32,  # larger batches go to the library's own predictor
+    'VERIFY_ROWS': 2000,
+}
+# Send a canned input through every predictor (ml_models/warmup.py) so the first request is not slow
+ML_WARMUP = {
+    'POST_FORK': True,  # in each gunicorn worker (gunicorn.conf.py)
+    'ON_READY': False,  # from PredictionsConfig.ready(), for single-process servers; not with gunicorn's preload_app
+    'BACKGROUND': True,  # ON_READY warm-up runs in a daemon thread
+}
+# Reload registry models (ModelsLoader) when their files in ml_models/models change, without restarting workers
+ML_MODEL_RELOAD = {
+    'ENABLED': False,
+    'POLL_SECONDS': 30,  # a change is loaded once the directory is unchanged for one more poll
+}
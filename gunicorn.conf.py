@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration for WEBSITE
+
+Usage: gunicorn -c gunicorn.conf.py
+
+The Django app and every ML model are loaded once in the master process before
+workers are forked, then the GC heap is frozen so workers share the model pages
+copy-on-write instead of each holding a private copy. Each worker then runs every
+predictor once on a canned input before it accepts requests.
+"""
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'WEBSITE.settings')
+
+wsgi_app = 'WEBSITE.wsgi:application'
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+
+# Import the application in the master so the models below are loaded pre-fork
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before any worker is forked"""
+    from ml_models.preload import preload_models
+    timings = preload_models(freeze=True)
+    server.log.info("Preloaded %d ML artifacts before fork", len(timings))
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after the fork: pay first-call costs before serving"""
+    from ml_models.conf import get_setting
+    if not (get_setting('ML_WARMUP', None) or {}).get('POST_FORK', True):
+        return
+    from ml_models.warmup import warm_up_predictors
+    timings = warm_up_predictors()
+    failed = sorted(name for name, entry in timings.items() if not entry['ok'])
+    server.log.info(
+        "Worker %s warmed up %d predictors in %.2fs%s", worker.pid, len(timings),
+        sum(entry['seconds'] for entry in timings.values()),
+        f" (failed: {', '.join(failed)})" if failed else "",
+    )
@@ -0,0 +1,177 @@
+"""
+Model Artifact Cache
+Content-addressed cache so a model file referenced by several predictors is loaded once per process.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import traceback
+from pathlib import Path
+try:
+    import joblib
+except Exception:
+    joblib = None
+try:
+    import cloudpickle
+except Exception:
+    cloudpickle = None
+
+
+def _load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _load_joblib(path):
+    if joblib is None:
+        raise ImportError("joblib is not installed")
+    return joblib.load(path)
+
+
+def _load_cloudpickle(path):
+    if cloudpickle is None:
+        raise ImportError("cloudpickle is not installed")
+    with open(path, 'rb') as f:
+        return cloudpickle.load(f)
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _load_native(path):
+    from .native import load_native
+    return load_native(path)
+
+
+LOADERS = {
+    'pickle': _load_pickle,
+    'joblib': _load_joblib,
+    'cloudpickle': _load_cloudpickle,
+    'json': _load_json,
+    'native': _load_native,
+}
+
+DEFAULT_LOADERS = ('pickle', 'joblib', 'cloudpickle')
+
+
+class ArtifactCache:
+    """Process-wide cache of deserialized model files keyed by SHA-256 of their content"""
+
+    def __init__(self):
+        self._artifacts = {}
+        self._info = {}
+        self._digests = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def fingerprint(self, path):
+        """
+        SHA-256 of a file's content
+        The digest is memoized per path and recomputed only when mtime or size change.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        self._digests[path] = (signature, digest)
+        return digest
+
+    def _get_lock(self, digest):
+        lock = self._locks.get(digest)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(digest, threading.Lock())
+        return lock
+
+    def load(self, path, loaders=DEFAULT_LOADERS):
+        """
+        Load a model file, reusing the already-loaded object if identical content was seen
+        Args:
+            path: Path to the serialized artifact
+            loaders: Loader names to try in order ('pickle', 'joblib', 'cloudpickle', 'json', 'native')
+        Returns:
+            The deserialized object
+        Raises:
+            FileNotFoundError if the file does not exist, or the last loader error
+        """
+        path = Path(path).resolve()
+        if not path.exists():
+            raise FileNotFoundError(f"Model file not found: {path}")
+
+        digest = self.fingerprint(path)
+        if digest in self._artifacts:
+            self._info[digest]['paths'].add(str(path))
+            return self._artifacts[digest]
+
+        with self._get_lock(digest):
+            if digest in self._artifacts:
+                self._info[digest]['paths'].add(str(path))
+                return self._artifacts[digest]
+
+            last_error = None
+            start = time.perf_counter()
+            for loader in loaders:
+                try:
+                    artifact = LOADERS[loader](path)
+                except Exception as e:
+                    print(f"{loader} load failed for {path.name}: {e}")
+                    last_error = e
+                    continue
+
+                load_time = time.perf_counter() - start
+                self._info[digest] = {
+                    'paths': {str(path)},
+                    'loader': loader,
+                    'load_time_seconds': round(load_time, 4),
+                    'size_bytes': os.path.getsize(path),
+                }
+                self._artifacts[digest] = artifact
+                return artifact
+
+            traceback.print_exception(type(last_error), last_error, last_error.__traceback__)
+            raise last_error
+
+    def evict(self, digest):
+        """
+        Drop a loaded artifact (e.g. the previous version of a reloaded model) so the
+        cache no longer keeps it alive; holders of the object are unaffected
+        """
+        with self._guard:
+            self._artifacts.pop(digest, None)
+            self._info.pop(digest, None)
+            self._locks.pop(digest, None)
+
+    def info(self, path):
+        """Load statistics for an already-loaded artifact, or an empty dict"""
+        try:
+            digest = self.fingerprint(path)
+        except OSError:
+            return {}
+        info = self._info.get(digest)
+        if info is None:
+            return {}
+        return dict(info, digest=digest, paths=sorted(info['paths']))
+
+    def stats(self):
+        """Statistics for every loaded artifact, keyed by content digest"""
+        return {
+            digest: dict(info, paths=sorted(info['paths']))
+            for digest, info in self._info.items()
+        }
+
+
+# Shared artifact cache for all predictors
+artifact_cache = ArtifactCache()
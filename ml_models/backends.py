@@ -0,0 +1,176 @@
+"""
+Inference Backends
+Run model methods in-process (default) or on a pool of worker processes that each load the artifacts once
+"""
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .artifacts import artifact_cache
+from .conf import get_setting
+from .native import load_model_with_source
+from .transport import receive_frame, send_frame
+
+# Batches from this many rows go through shared memory; smaller ones are pickled
+DEFAULT_SHM_MIN_ROWS = 2000
+
+# How a worker process finds a model: registry name, artifact path, artifact_cache loaders, and the
+# content digest of the version the caller holds (None: whichever version the worker has)
+ModelSpec = namedtuple('ModelSpec', ['name', 'path', 'loaders', 'digest'], defaults=(None,))
+
+
+class InlineBackend:
+    """Calls the predictor's own resident model in the current process"""
+
+    name = 'inline'
+
+    def run(self, spec, method, X, get_local_model):
+        return getattr(get_local_model(), method)(X)
+
+    def stats(self):
+        return {'backend': self.name}
+
+
+# Models loaded inside a worker process: spec name -> (content digest, model)
+_WORKER_MODELS = {}
+
+
+def _worker_model(spec):
+    entry = _WORKER_MODELS.get(spec.name)
+    if entry is not None and spec.digest in (None, entry[0]):
+        return entry[1]
+    # First use, or the web process reloaded the file: load it as it is now
+    model, source_path = load_model_with_source(spec.path, loaders=spec.loaders)
+    digest = artifact_cache.info(source_path).get('digest')
+    if entry is not None and entry[0] != digest:
+        artifact_cache.evict(entry[0])
+    _WORKER_MODELS[spec.name] = (digest, model)
+    return model
+
+
+def _worker_run(spec, method, descriptor):
+    """Body of a process-pool task: load (once), read features from shared memory, predict"""
+    model = _worker_model(spec)
+    with receive_frame(descriptor) as X:
+        return np.asarray(getattr(model, method)(X))
+
+
+def _worker_run_pickled(spec, method, X):
+    """Same as _worker_run for small frames sent pickled"""
+    return np.asarray(getattr(_worker_model(spec), method)(X))
+
+
+def _worker_preload(specs):
+    """Pool initializer: load the given artifacts before the first task arrives"""
+    for spec in specs:
+        try:
+            _worker_model(spec)
+        except Exception as e:
+            print(f"[WARNING] Inference worker {os.getpid()} could not preload {spec.name}: {e}")
+
+
+class ProcessBackend:
+    """
+    ProcessPoolExecutor of inference workers
+
+    Feature frames of at least shm_min_rows rows travel through shared memory (see
+    transport.py), so only a small descriptor and the prediction array are pickled.
+    Smaller frames are pickled: rebuilding a wide DataFrame from shared memory has a
+    fixed cost of a few milliseconds that only pays off for large batches (see the
+    benchmark_transport command). Each worker keeps its own copy of every model it
+    has used, so CPU-heavy pipelines run on all cores regardless of how well they
+    release the GIL, and loads the file again once the caller holds another version.
+    """
+
+    name = 'process'
+
+    def __init__(self, max_workers=None, start_method='forkserver', preload=(),
+                 shm_min_rows=DEFAULT_SHM_MIN_ROWS):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self.shm_min_rows = shm_min_rows
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_worker_preload,
+            initargs=(tuple(preload),),
+        )
+
+    def run(self, spec, method, X, get_local_model):
+        if len(X) < self.shm_min_rows:
+            return self._pool.submit(_worker_run_pickled, spec, method, X).result()
+        with send_frame(X) as descriptor:
+            return self._pool.submit(_worker_run, spec, method, descriptor).result()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'max_workers': self.max_workers,
+            'start_method': self.start_method,
+            'shm_min_rows': self.shm_min_rows,
+        }
+
+
+# Models served by the process backend, registered by their predictor modules
+REGISTERED_SPECS = {}
+
+_BACKEND = None
+_BACKEND_PID = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def register_model(name, path, loaders):
+    """Declare a model that may run out of process; returns its ModelSpec"""
+    spec = ModelSpec(name, str(path), tuple(loaders))
+    REGISTERED_SPECS[name] = spec
+    return spec
+
+
+def _create_backend():
+    config = get_setting('ML_INFERENCE_BACKEND', None) or {}
+    name = config.get('BACKEND', 'inline')
+    if name == 'inline':
+        return InlineBackend()
+    if name == 'process':
+        preload = [REGISTERED_SPECS[n] for n in config.get('PRELOAD', ()) if n in REGISTERED_SPECS]
+        return ProcessBackend(
+            max_workers=config.get('MAX_WORKERS'),
+            start_method=config.get('START_METHOD', 'forkserver'),
+            preload=preload,
+            shm_min_rows=config.get('SHM_MIN_ROWS', DEFAULT_SHM_MIN_ROWS),
+        )
+    raise ValueError(f"Unknown ML_INFERENCE_BACKEND '{name}' (expected 'inline' or 'process')")
+
+
+def get_backend():
+    """Process-wide backend from settings.ML_INFERENCE_BACKEND (recreated after fork)"""
+    global _BACKEND, _BACKEND_PID
+    if _BACKEND is None or _BACKEND_PID != os.getpid():
+        with _BACKEND_LOCK:
+            if _BACKEND is None or _BACKEND_PID != os.getpid():
+                _BACKEND = _create_backend()
+                _BACKEND_PID = os.getpid()
+    return _BACKEND
+
+
+def run_model(spec, method, X, get_local_model, digest=None):
+    """
+    Call model.<method>(X) on the configured backend
+    Args:
+        spec: ModelSpec from register_model
+        method: 'predict' or 'predict_proba'
+        X: Feature DataFrame
+        get_local_model: Zero-argument callable returning the in-process model (inline backend)
+        digest: Digest of the registry version get_local_model returns, so worker processes
+            load the new file once the web process has reloaded it
+    """
+    if digest is not None:
+        spec = spec._replace(digest=digest)
+    return get_backend().run(spec, method, X, get_local_model)
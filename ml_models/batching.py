@@ -0,0 +1,202 @@
+"""
+Micro-Batching
+Coalesce concurrent single-row predictions into one vectorized model call per model
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from .classifiers import predict_with_proba
+from .conf import get_setting
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+def get_config():
+    """settings.ML_MICROBATCH merged over the defaults (micro-batching is off unless enabled)"""
+    config = get_setting('ML_MICROBATCH', None) or {}
+    return {
+        'ENABLED': config.get('ENABLED', False),
+        'MAX_BATCH_SIZE': config.get('MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE),
+        'MAX_WAIT_MS': config.get('MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS),
+    }
+
+
+class MicroBatcher:
+    """
+    Collects submitted items for up to max_wait_ms or max_batch_size items, runs
+    batch_fn once on the list and hands each caller its own output
+
+    batch_fn(items) must return one output per item, in order. If it raises, every
+    caller in that batch gets the exception. The collector is a daemon thread,
+    started on first submit and restarted in forked children.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._metrics = {
+            'batches': 0,
+            'items': 0,
+            'max_batch_size_seen': 0,
+            'queue_delay_ms_total': 0.0,
+            'queue_delay_ms_max': 0.0,
+            'errors': 0,
+        }
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            # Threads do not survive fork: a preloaded parent's collector is gone in the child
+            self._pid = os.getpid()
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._queue,), name=f'microbatch-{self.name}', daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, item, timeout=None):
+        """Queue one item and block until its output is ready"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result(timeout=timeout)
+
+    def _collect(self, q):
+        """Block for the first item, then gather more until the batch is full or the wait expires"""
+        batch = [q.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, q):
+        while True:
+            batch = self._collect(q)
+            started = time.perf_counter()
+            items = [item for item, _, _ in batch]
+            try:
+                outputs = self.batch_fn(items)
+                if len(outputs) != len(items):
+                    raise RuntimeError(
+                        f'{self.name} batch returned {len(outputs)} outputs for {len(items)} items'
+                    )
+            except Exception as e:
+                self._record(batch, started, error=True)
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            self._record(batch, started)
+            for (_, future, _), output in zip(batch, outputs):
+                future.set_result(output)
+
+    def _record(self, batch, started, error=False):
+        delays = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        with self._metrics_lock:
+            m = self._metrics
+            m['batches'] += 1
+            m['items'] += len(batch)
+            m['max_batch_size_seen'] = max(m['max_batch_size_seen'], len(batch))
+            m['queue_delay_ms_total'] += sum(delays)
+            m['queue_delay_ms_max'] = max(m['queue_delay_ms_max'], max(delays))
+            if error:
+                m['errors'] += 1
+
+    def metrics(self):
+        """Batch-size and queue-delay statistics since start"""
+        with self._metrics_lock:
+            m = dict(self._metrics)
+        total_delay = m.pop('queue_delay_ms_total')
+        m['avg_batch_size'] = round(m['items'] / m['batches'], 2) if m['batches'] else 0.0
+        m['avg_queue_delay_ms'] = round(total_delay / m['items'], 3) if m['items'] else 0.0
+        m['queue_delay_ms_max'] = round(m['queue_delay_ms_max'], 3)
+        m.update(max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait * 1000)
+        return m
+
+
+_BATCHERS = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def get_batcher(name, batch_fn):
+    """Per-model batcher singleton, created from settings.ML_MICROBATCH on first use"""
+    batcher = _BATCHERS.get(name)
+    if batcher is None:
+        with _BATCHERS_LOCK:
+            batcher = _BATCHERS.get(name)
+            if batcher is None:
+                config = get_config()
+                batcher = MicroBatcher(
+                    name, batch_fn,
+                    max_batch_size=config['MAX_BATCH_SIZE'],
+                    max_wait_ms=config['MAX_WAIT_MS'],
+                )
+                _BATCHERS[name] = batcher
+    return batcher
+
+
+def batcher_metrics():
+    """Metrics of every batcher created in this process, keyed by model name"""
+    return {name: batcher.metrics() for name, batcher in list(_BATCHERS.items())}
+
+
+def _classify_frames(items):
+    """
+    predict_with_proba over stacked one-row frames, split back into (label, proba row) pairs
+    Items are (model, frame) pairs; frames are grouped per model, so requests that
+    started before a model reload still run on the version they were prepared for.
+    """
+    groups = {}
+    for position, (model, frame) in enumerate(items):
+        groups.setdefault(id(model), (model, []))[1].append(position)
+
+    outputs = [None] * len(items)
+    for model, positions in groups.values():
+        frames = [items[position][1] for position in positions]
+        X = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        labels, probabilities = predict_with_proba(model, X)
+        for row, position in enumerate(positions):
+            outputs[position] = (labels[row], None if probabilities is None else probabilities[row])
+    return outputs
+
+
+def batched_predict_with_proba(name, get_model, X):
+    """
+    predict_with_proba for a one-row feature frame, coalesced with concurrent calls
+    for the same model when settings.ML_MICROBATCH is enabled
+    Args:
+        name: Model name (one batcher per name)
+        get_model: Zero-argument callable returning the current model (called once, by the caller)
+        X: One-row DataFrame
+    Returns:
+        Same (labels, probabilities) shapes as predict_with_proba for one row
+    """
+    model = get_model()
+    if not get_config()['ENABLED']:
+        return predict_with_proba(model, X)
+
+    batcher = get_batcher(name, _classify_frames)
+    label, proba = batcher.submit((model, X))
+    return np.asarray([label]), None if proba is None else proba[np.newaxis, :]
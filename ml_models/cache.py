@@ -0,0 +1,158 @@
+"""
+Prediction Result Cache
+Memoizes model outputs keyed by normalized inputs, model fingerprint and time bucket
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .conf import get_setting
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600
+
+_MISSING = object()
+
+
+class PredictionCache:
+    """
+    Bounded LRU + TTL cache for prediction results
+
+    Keys are the SHA-256 of the canonical JSON of (namespace, model fingerprint,
+    time bucket, normalized features). The fingerprint is the content digest of the
+    loaded model file, so a reloaded model gets fresh keys and stale entries simply
+    age out. Entries live in process memory, or in a Django cache when a backend
+    alias is configured (shared between workers).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 enabled=True, backend=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.backend_alias = backend
+        self._backend = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'expirations': 0}
+
+    @classmethod
+    def from_settings(cls):
+        """Build the cache from settings.ML_PREDICTION_CACHE"""
+        config = get_setting('ML_PREDICTION_CACHE', None) or {}
+        return cls(
+            max_entries=config.get('MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+            ttl_seconds=config.get('TTL_SECONDS', DEFAULT_TTL_SECONDS),
+            enabled=config.get('ENABLED', True),
+            backend=config.get('BACKEND'),
+        )
+
+    @property
+    def backend(self):
+        """Django cache for the configured alias, or None for the in-process LRU"""
+        if self.backend_alias and self._backend is None:
+            from django.core.cache import caches
+            self._backend = caches[self.backend_alias]
+        return self._backend
+
+    def make_key(self, namespace, features, fingerprint=None, time_bucket=None):
+        """Canonical hash of a normalized feature row"""
+        payload = json.dumps(
+            [namespace, fingerprint, time_bucket, self._generation, features],
+            sort_keys=True, separators=(',', ':'), default=str,
+        )
+        return 'ml_pred:' + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached value, or the module's _MISSING sentinel"""
+        backend = self.backend
+        if backend is not None:
+            value = backend.get(key, _MISSING)
+        else:
+            value = self._get_local(key)
+
+        with self._lock:
+            self._counters['misses' if value is _MISSING else 'hits'] += 1
+        return value
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        backend = self.backend
+        if backend is not None:
+            backend.set(key, value, timeout=self.ttl_seconds)
+            with self._lock:
+                self._counters['stores'] += 1
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            self._counters['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def get_or_compute(self, namespace, features, compute, fingerprint=None, time_bucket=None,
+                       should_store=None):
+        """
+        Return the cached result for these inputs, or compute and cache it
+        Args:
+            namespace: Predictor name, keeps key spaces apart
+            features: JSON-serializable normalized inputs that fully determine the model input
+            compute: Zero-argument callable producing the result
+            fingerprint: Model artifact digest (None when unknown)
+            time_bucket: Time-dependent inputs baked into the features (e.g. month)
+            should_store: Optional predicate; results failing it (errors) are not cached
+        """
+        if not self.enabled:
+            return compute()
+
+        key = self.make_key(namespace, features, fingerprint, time_bucket)
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+
+        value = compute()
+        if should_store is None or should_store(value):
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Invalidate every entry (backend entries become unreachable through a new key generation)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats.update(
+            enabled=self.enabled,
+            backend=self.backend_alias or 'local',
+            max_entries=self.max_entries,
+            ttl_seconds=self.ttl_seconds,
+        )
+        return stats
+
+
+# Shared prediction cache for all predictors
+prediction_cache = PredictionCache.from_settings()
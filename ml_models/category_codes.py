@@ -0,0 +1,58 @@
+"""
+Category Code Tables
+Persisted category -> integer code lookups for label-encoded model features
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Code used for any value not seen in training. Training codes start at 0, so
+# tree models route unknown values the same way as the lowest code's side of every split.
+UNKNOWN_CODE = -1
+
+
+class CategoryCodeTable:
+    """Per-column category -> code mapping with a defined unknown bucket"""
+
+    def __init__(self, columns=None, unknown_code=UNKNOWN_CODE):
+        self.columns = columns or {}
+        self.unknown_code = unknown_code
+
+    @classmethod
+    def fit(cls, data, columns):
+        """
+        Build the table from training data, matching sklearn LabelEncoder codes
+        (sorted unique string values numbered from 0)
+        Args:
+            data: Mapping of column name -> iterable of training values (e.g. a DataFrame)
+            columns: Categorical columns to encode
+        """
+        table = {}
+        for col in columns:
+            values = sorted({str(v) for v in data[col]})
+            table[col] = {value: code for code, value in enumerate(values)}
+        return cls(table)
+
+    @classmethod
+    def from_dict(cls, payload):
+        return cls(payload.get('columns', {}), payload.get('unknown_code', UNKNOWN_CODE))
+
+    def to_dict(self):
+        return {'unknown_code': self.unknown_code, 'columns': self.columns}
+
+    def save(self, path):
+        with open(Path(path), 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, sort_keys=True)
+
+    def encode(self, column, value):
+        """Code for a single value"""
+        return self.columns.get(column, {}).get(str(value), self.unknown_code)
+
+    def encode_many(self, column, values):
+        """Codes for a sequence of values as an int64 array"""
+        mapping = self.columns.get(column, {})
+        unknown = self.unknown_code
+        return np.fromiter(
+            (mapping.get(str(v), unknown) for v in values), dtype=np.int64, count=len(values)
+        )
@@ -0,0 +1,33 @@
+"""
+Classifier Helpers
+Single-pass classification shared by every classifier predictor
+"""
+import numpy as np
+
+
+def predict_with_proba(model, X):
+    """
+    Predict labels and class probabilities with one model evaluation
+
+    Calls predict_proba once and derives the label with argmax over the model's
+    classes_ ordering, instead of calling predict and predict_proba separately
+    (which traverses a tree ensemble twice).
+
+    Args:
+        model: Fitted classifier or pipeline
+        X: Feature matrix / DataFrame
+
+    Returns:
+        Tuple of (labels array, probabilities array). Probabilities are None
+        for models without predict_proba, in which case predict is used.
+    """
+    if not hasattr(model, 'predict_proba'):
+        return np.asarray(model.predict(X)), None
+
+    proba = np.asarray(model.predict_proba(X))
+    best = proba.argmax(axis=1)
+
+    classes = getattr(model, 'classes_', None)
+    if classes is None:
+        return best, proba
+    return np.asarray(classes)[best], proba
@@ -0,0 +1,433 @@
+"""
+Compiled Tree Ensembles
+Evaluate XGBoost and scikit-learn forests from flat NumPy arrays to cut small-batch prediction overhead
+"""
+import json
+
+import numpy as np
+
+from .conf import get_setting
+
+# Above roughly this many rows the libraries' own (multi-threaded) predictors are faster
+DEFAULT_MAX_ROWS = 32
+DEFAULT_VERIFY_ROWS = 2000
+
+# XGBoost objectives with one output per row: objective -> transform of the raw margin
+_XGB_LOGISTIC = {'binary:logistic', 'reg:logistic'}
+_XGB_IDENTITY = {'binary:logitraw', 'reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror'}
+
+
+class TreeArrays:
+    """
+    Every node of every tree in contiguous arrays (feature, threshold, left, right,
+    missing_left, value), with one root per tree
+
+    Leaves point back to themselves, so a fixed number of level-wise steps (the
+    deepest tree's depth) walks all trees for all rows at once.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, depth, strict):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        # XGBoost sends x < threshold left, scikit-learn x <= threshold
+        self.goes_left = np.less if strict else np.less_equal
+
+    @classmethod
+    def from_trees(cls, trees, strict):
+        """
+        Concatenate per-tree node arrays
+        Args:
+            trees: Iterable of (feature, threshold, left, right, missing_left, value, is_leaf)
+                   per tree, children indexed within their tree
+            strict: True for x < threshold (XGBoost), False for x <= threshold
+        """
+        parts = [[] for _ in range(6)]
+        roots = []
+        depth = 0
+        offset = 0
+        for feature, threshold, left, right, missing_left, value, is_leaf in trees:
+            n_nodes = len(feature)
+            own = np.arange(n_nodes)
+            left = np.where(is_leaf, own, left) + offset
+            right = np.where(is_leaf, own, right) + offset
+            for part, array in zip(parts, (np.where(is_leaf, 0, feature), threshold, left, right,
+                                           missing_left | is_leaf, value)):
+                part.append(array)
+            roots.append(offset)
+            depth = max(depth, _tree_depth(left - offset, right - offset, is_leaf))
+            offset += n_nodes
+
+        feature, threshold, left, right, missing_left, value = (np.concatenate(part) for part in parts)
+        return cls(feature.astype(np.intp), threshold, left.astype(np.intp), right.astype(np.intp),
+                   missing_left.astype(bool), value, np.asarray(roots, dtype=np.intp), depth, strict)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def leaves(self, X):
+        """Leaf node index reached by every row in every tree: (rows, trees) array"""
+        n_rows, n_features = X.shape
+        node = np.repeat(self.roots[np.newaxis, :], n_rows, axis=0)
+        flat = X.ravel()
+        row_start = (np.arange(n_rows, dtype=np.intp) * n_features)[:, np.newaxis]
+        check_missing = np.isnan(flat).any()
+        for _ in range(self.depth):
+            x = flat[row_start + self.feature[node]]
+            go_left = self.goes_left(x, self.threshold[node])
+            if check_missing:
+                go_left = np.where(np.isnan(x), self.missing_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+
+def _tree_depth(left, right, is_leaf):
+    depth = 0
+    level = np.array([0])
+    while True:
+        level = level[~is_leaf[level]]
+        if not len(level):
+            return depth
+        level = np.concatenate([left[level], right[level]])
+        depth += 1
+
+
+class CompiledModel:
+    """
+    Base wrapper: evaluates small batches with the compiled arrays and hands
+    anything else (large batches, unexpected input) to the original model
+
+    Attributes not defined here (classes_, feature names, get_booster, ...) are
+    read from the original model, so callers can use the wrapper in its place.
+    """
+
+    def __init__(self, model, trees, feature_names, max_rows=DEFAULT_MAX_ROWS):
+        self.model = model
+        self.trees = trees
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.max_rows = max_rows
+
+    def __getattr__(self, name):
+        # Only called for attributes missing on the wrapper
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def _as_matrix(self, X):
+        """float32 C-ordered matrix for X, or None when the original model should handle it"""
+        if hasattr(X, 'dtypes'):
+            if self.feature_names is not None and list(X.columns) != self.feature_names:
+                return None
+            if any(getattr(dtype, 'kind', 'O') not in 'biuf' for dtype in X.dtypes):
+                return None
+            X = X.to_numpy(dtype=np.float32)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features or len(X) > self.max_rows:
+            return None
+        return X
+
+    def predict(self, X):
+        matrix = self._as_matrix(X)
+        if matrix is None:
+            return self.model.predict(X)
+        return self._predict(matrix)
+
+    @property
+    def predict_proba(self):
+        # Regressors have no predict_proba, so hasattr() answers as it would for the model
+        if not self.is_classifier:
+            raise AttributeError(f"'{type(self.model).__name__}' object has no attribute 'predict_proba'")
+        return self._predict_proba_or_delegate
+
+    def _predict_proba_or_delegate(self, X):
+        matrix = self._as_matrix(X)
+        if matrix is None:
+            return self.model.predict_proba(X)
+        return self._predict_proba(matrix)
+
+
+class CompiledXGBModel(CompiledModel):
+    """
+    XGBClassifier (binary) / XGBRegressor with one output per row
+
+    Matches XGBoost's CPU predictor: float32 features compared against float32
+    split conditions, leaf values added to the base margin one tree at a time in
+    float32, then the objective's transform in float32.
+    """
+
+    def __init__(self, model, trees, feature_names, base_margin, logistic, max_rows=DEFAULT_MAX_ROWS):
+        super().__init__(model, trees, feature_names, max_rows)
+        self.n_features = model.n_features_in_
+        self.base_margin = np.float32(base_margin)
+        self.logistic = logistic
+        self.is_classifier = hasattr(model, 'predict_proba')
+
+    def _output(self, X):
+        values = self.trees.value[self.trees.leaves(X)]
+        # Running sum from the base margin, tree by tree, in float32 (cumsum is sequential)
+        margin = np.cumsum(
+            np.concatenate([np.full((len(X), 1), self.base_margin), values], axis=1),
+            axis=1, dtype=np.float32,
+        )[:, -1]
+        if not self.logistic:
+            return margin
+        # common::Sigmoid: 1 / (expf(min(-x, 88.7)) + 1)
+        return np.float32(1.0) / (_expf(np.minimum(-margin, np.float32(88.7))) + np.float32(1.0))
+
+    def _predict(self, X):
+        output = self._output(X)
+        if not self.is_classifier:
+            return output
+        labels = np.repeat(0, len(output))
+        labels[output > 0.5] = 1
+        return labels
+
+    def _predict_proba(self, X):
+        positive = self._output(X)
+        return np.vstack((1.0 - positive, positive)).transpose()
+
+
+class CompiledForest(CompiledModel):
+    """
+    RandomForest / ExtraTrees classifier or regressor with a single output
+
+    Matches scikit-learn: float32 features compared against float64 thresholds,
+    per-tree leaf values summed tree by tree in float64, divided by the tree count.
+    """
+
+    def __init__(self, model, trees, feature_names, max_rows=DEFAULT_MAX_ROWS):
+        super().__init__(model, trees, feature_names, max_rows)
+        self.n_features = model.n_features_in_
+        self.is_classifier = hasattr(model, 'classes_')
+
+    def _mean(self, X):
+        values = self.trees.value[self.trees.leaves(X)]
+        total = np.cumsum(values, axis=1)[:, -1]
+        total /= self.trees.n_trees
+        return total
+
+    def _predict(self, X):
+        if not self.is_classifier:
+            return self._mean(X)
+        return self.model.classes_.take(np.argmax(self._mean(X), axis=1), axis=0)
+
+    def _predict_proba(self, X):
+        return self._mean(X)
+
+
+_LIBM_EXPF = None
+
+
+def _libm_expf():
+    """The C library expf XGBoost itself calls (not correctly rounded, so NumPy's exp can differ by 1 ulp)"""
+    global _LIBM_EXPF
+    if _LIBM_EXPF is None:
+        import ctypes
+        import ctypes.util
+
+        expf = False
+        name = ctypes.util.find_library('m')
+        if name:
+            try:
+                expf = ctypes.CDLL(name).expf
+                expf.restype = ctypes.c_float
+                expf.argtypes = [ctypes.c_float]
+            except (OSError, AttributeError):
+                expf = False
+        _LIBM_EXPF = expf
+    return _LIBM_EXPF
+
+
+def _expf(x):
+    """float32 exp of a float32 array, element by element through libm when available"""
+    expf = _libm_expf()
+    if not expf:
+        return np.exp(x.astype(np.float64)).astype(np.float32)
+    return np.fromiter(map(expf, x.tolist()), dtype=np.float32, count=len(x))
+
+
+def _parse_base_score(value):
+    # Stored as "5E-1" or, since XGBoost 2, "[5E-1]"
+    return float(str(value).strip('[]'))
+
+
+def _compile_xgboost(model, max_rows):
+    booster = model.get_booster()
+    config = json.loads(booster.save_raw('json'))['learner']
+    objective = config['objective']['name']
+    if objective not in _XGB_LOGISTIC | _XGB_IDENTITY:
+        raise ValueError(f'Unsupported XGBoost objective {objective}')
+    if config['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Unsupported XGBoost booster {config['gradient_booster']['name']}")
+    params = config['learner_model_param']
+    if int(params.get('num_class', 0)) > 1 or int(params.get('num_target', 1)) > 1:
+        raise ValueError('Only single-output XGBoost models can be compiled')
+
+    gbtree = config['gradient_booster']['model']
+    trees = gbtree['trees']
+    try:
+        best_iteration = model.best_iteration
+    except AttributeError:
+        best_iteration = None
+    if best_iteration is not None:
+        # The sklearn wrapper predicts with the early-stopping best iteration
+        trees = trees[:(best_iteration + 1) * int(gbtree['gbtree_model_param']['num_parallel_tree'])]
+
+    arrays = []
+    for tree in trees:
+        if tree.get('categories_nodes') or any(tree.get('split_type', ())):
+            raise ValueError('Categorical splits are not supported')
+        left = np.asarray(tree['left_children'], dtype=np.intp)
+        is_leaf = left == -1
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        arrays.append((
+            np.asarray(tree['split_indices'], dtype=np.intp),
+            conditions,
+            left,
+            np.asarray(tree['right_children'], dtype=np.intp),
+            np.asarray(tree['default_left'], dtype=bool),
+            # Leaves keep their value in split_conditions
+            np.where(is_leaf, conditions, np.float32(0)),
+            is_leaf,
+        ))
+
+    base_score = _parse_base_score(params['base_score'])
+    logistic = objective in _XGB_LOGISTIC
+    if logistic:
+        base_margin = np.float32(-np.log(np.float32(1.0) / np.float32(base_score) - np.float32(1.0)))
+    else:
+        base_margin = np.float32(base_score)
+
+    return CompiledXGBModel(
+        model, TreeArrays.from_trees(arrays, strict=True), booster.feature_names,
+        base_margin, logistic, max_rows=max_rows,
+    )
+
+
+def _compile_forest(model, max_rows):
+    if model.n_outputs_ != 1:
+        raise ValueError('Only single-output forests can be compiled')
+    is_classifier = hasattr(model, 'classes_')
+    arrays = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        # value: (nodes, outputs, classes) -> per-tree prediction at each node
+        value = tree.value[:, 0, :model.n_classes_] if is_classifier else tree.value[:, 0, 0]
+        missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+        arrays.append((tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                       np.asarray(missing_left, dtype=bool), value, is_leaf))
+    return CompiledForest(model, TreeArrays.from_trees(arrays, strict=False),
+                          getattr(model, 'feature_names_in_', None), max_rows=max_rows)
+
+
+def compile_model(model, max_rows=DEFAULT_MAX_ROWS):
+    """
+    Build the compiled evaluator for a fitted tree ensemble
+    Raises:
+        ValueError for models (or model options) without a compiled evaluator
+    """
+    try:
+        from xgboost import XGBModel
+    except ImportError:
+        XGBModel = None
+    if XGBModel is not None and isinstance(model, XGBModel):
+        return _compile_xgboost(model, max_rows)
+
+    from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, \
+        RandomForestRegressor
+    if isinstance(model, (RandomForestClassifier, RandomForestRegressor,
+                          ExtraTreesClassifier, ExtraTreesRegressor)):
+        return _compile_forest(model, max_rows)
+
+    raise ValueError(f'No compiled evaluator for {type(model).__name__}')
+
+
+def sample_inputs(compiled, rows=DEFAULT_VERIFY_ROWS, seed=0):
+    """
+    Verification matrix that exercises both sides of every split: each value is a
+    split threshold of its feature, one of its float32 neighbours, or a value drawn
+    across the feature's threshold range
+    """
+    rng = np.random.default_rng(seed)
+    trees = compiled.trees
+    internal = trees.left != np.arange(len(trees.left))
+    X = np.zeros((rows, compiled.n_features), dtype=np.float32)
+    for feature in range(compiled.n_features):
+        thresholds = trees.threshold[internal & (trees.feature == feature)].astype(np.float32)
+        if not len(thresholds):
+            X[:, feature] = rng.integers(0, 2, rows)
+            continue
+        low, high = float(thresholds.min()), float(thresholds.max())
+        span = max(high - low, 1.0)
+        picked = rng.choice(thresholds, rows)
+        nudged = np.where(rng.random(rows) < 0.5,
+                          np.nextafter(picked, np.float32(-np.inf)),
+                          np.nextafter(picked, np.float32(np.inf)))
+        spread = rng.uniform(low - 0.1 * span, high + 0.1 * span, rows).astype(np.float32)
+        choice = rng.integers(0, 3, rows)
+        X[:, feature] = np.select([choice == 0, choice == 1], [picked, nudged], spread)
+    return X
+
+
+def verify(compiled, X):
+    """
+    True when the compiled evaluator reproduces the original model bit for bit on X
+    (values and dtypes of predict and, for classifiers, predict_proba)
+    """
+    original = compiled.model
+    if compiled.feature_names is not None:
+        import pandas as pd
+        frame = pd.DataFrame(X, columns=compiled.feature_names)
+    else:
+        frame = X
+
+    checks = [(original.predict, compiled._predict)]
+    if compiled.is_classifier:
+        checks.append((original.predict_proba, compiled._predict_proba))
+    for expected_fn, actual_fn in checks:
+        expected = np.asarray(expected_fn(frame))
+        actual = np.asarray(actual_fn(X))
+        if expected.dtype != actual.dtype or not np.array_equal(expected, actual):
+            return False
+    return True
+
+
+def compile_if_enabled(model, name):
+    """
+    Swap a loaded tree ensemble for its compiled evaluator when settings.ML_COMPILED_TREES
+    enables it and the evaluator matches the model exactly on a verification sample;
+    otherwise return the model unchanged. Predictors call it once per model version
+    (a models_loader preparer), which keeps the evaluator only as long as the version.
+    """
+    config = get_setting('ML_COMPILED_TREES', None) or {}
+    if model is None or not config.get('ENABLED', False):
+        return model
+    return _compile_verified(model, name, config)
+
+
+def _compile_verified(model, name, config):
+    try:
+        compiled = compile_model(model, max_rows=config.get('MAX_ROWS', DEFAULT_MAX_ROWS))
+    except ValueError as e:
+        print(f"[WARNING] {name}: not compiling trees ({e})")
+        return model
+
+    rows = config.get('VERIFY_ROWS', DEFAULT_VERIFY_ROWS)
+    try:
+        matches = verify(compiled, sample_inputs(compiled, rows))
+    except Exception as e:
+        print(f"[WARNING] {name}: compiled trees could not be verified ({e}); using the original model")
+        return model
+    if not matches:
+        print(f"[WARNING] {name}: compiled trees differ from the original model; using the original model")
+        return model
+
+    print(f"[OK] {name}: compiled {compiled.trees.n_trees} trees (verified on {rows} rows)")
+    return compiled
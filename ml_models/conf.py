@@ -0,0 +1,21 @@
+"""
+ML Settings
+Read ML_* Django settings, falling back to defaults when ml_models runs without Django
+"""
+
+
+def get_setting(name, default=None):
+    """
+    Value of a Django setting, or default when Django is unavailable or not configured
+    (e.g. the standalone test scripts that import predictors directly)
+    """
+    try:
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+    except ImportError:
+        return default
+
+    try:
+        return getattr(settings, name, default)
+    except ImproperlyConfigured:
+        return default
@@ -0,0 +1,102 @@
+"""
+Inference Executor
+Bounded thread pool that runs model calls off the event loop for async views
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .conf import get_setting
+
+DEFAULT_MAX_QUEUE = 64
+
+
+class InferenceQueueFull(Exception):
+    """Raised when every worker is busy and the waiting queue is at capacity"""
+
+
+class InferenceExecutor:
+    """
+    ThreadPoolExecutor with admission control
+
+    At most max_workers calls run at once and at most max_queue more wait for a
+    worker; anything beyond that is rejected immediately with InferenceQueueFull
+    instead of piling up behind the models. NumPy / scikit-learn / XGBoost release
+    the GIL in their inner loops, so threads give real parallelism per core.
+    """
+
+    def __init__(self, max_workers=None, max_queue=DEFAULT_MAX_QUEUE):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max(0, int(max_queue))
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='inference')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._completed = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs); raises InferenceQueueFull when at capacity"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise InferenceQueueFull(
+                f'Inference queue is full ({self.max_workers} running, {self.max_queue} waiting)'
+            )
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        self._slots.release()
+
+    async def run(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) executed on the pool"""
+        return await asyncio.wrap_future(self.submit(functools.partial(fn, *args, **kwargs)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected,
+            }
+
+
+_EXECUTOR = None
+_EXECUTOR_PID = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor():
+    """Process-wide executor built from settings.ML_INFERENCE_EXECUTOR (recreated after fork)"""
+    global _EXECUTOR, _EXECUTOR_PID
+    if _EXECUTOR is None or _EXECUTOR_PID != os.getpid():
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None or _EXECUTOR_PID != os.getpid():
+                config = get_setting('ML_INFERENCE_EXECUTOR', None) or {}
+                _EXECUTOR = InferenceExecutor(
+                    max_workers=config.get('MAX_WORKERS'),
+                    max_queue=config.get('MAX_QUEUE', DEFAULT_MAX_QUEUE),
+                )
+                _EXECUTOR_PID = os.getpid()
+    return _EXECUTOR
+
+
+async def run_inference(fn, *args, **kwargs):
+    """Run a predictor call on the shared inference executor"""
+    return await get_executor().run(fn, *args, **kwargs)
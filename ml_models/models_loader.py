@@ -1,35 +1,67 @@
 """
 ML Models Loader
-Loads all .pkl model files once at startup for efficient prediction serving.
+Registry of .pkl model files, each loaded on first use and swapped for a new version when its file changes.
 """
 import os
-import pickle
+import threading
+import time
+from collections import namedtuple
 from pathlib import Path
-import traceback
-try:
-    import joblib
-except Exception:
-    joblib = None
-try:
-    import cloudpickle
-except Exception:
-    cloudpickle = None
+from .artifacts import DEFAULT_LOADERS, artifact_cache
+from .conf import get_setting
+
+DEFAULT_POLL_SECONDS = 30
+
+# Loader order for the entries saved with joblib (artifact_cache tries pickle first otherwise);
+# .json entries load as JSON
+MODEL_LOADERS = {
+    'salary_regression': ('joblib', 'pickle'),
+    'remote_work': ('joblib',),
+    'growth_lgbm': ('joblib', 'pickle'),
+}
+
+# One loaded version of a registered model; replaced as a whole when the file changes,
+# so a reader never sees the model of one version with the digest of another.
+# prepared holds the objects built from this model (see ModelsLoader.add_preparer)
+ModelVersion = namedtuple(
+    'ModelVersion', ['version', 'filename', 'model', 'digest', 'signature', 'loaded_at', 'prepared']
+)
+
+_MISSING = object()
+
+
+def _file_signature(path):
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
 
 
 class ModelsLoader:
-    """Singleton class to load and cache ML models"""
+    """Singleton registry that lazily loads and caches ML models"""
     _instance = None
-    _models = {}
-    
+
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(ModelsLoader, cls).__new__(cls)
-            cls._instance._load_models()
+            instance = super(ModelsLoader, cls).__new__(cls)
+            instance._versions = {}
+            instance._stats = {}
+            instance._locks = {}
+            instance._locks_guard = threading.Lock()
+            instance._model_files = None
+            instance._preparers = {}
+            instance.models_dir = Path(__file__).parent / 'models'
+            # Reload watcher state (see check_for_updates): last applied and last seen directory manifests
+            instance._reload_lock = threading.Lock()
+            instance._manifest = None
+            instance._pending_manifest = None
+            instance._watcher = None
+            instance._watcher_pid = None
+            instance._no_watch_pid = None
+            cls._instance = instance
         return cls._instance
-    
-    def _load_models(self):
-        """Load all .pkl models from the models directory"""
-        models_dir = Path(__file__).parent / 'models'
+
+    def _resolve_model_files(self):
+        """Map registry names to model filenames (no file is opened here)"""
+        models_dir = self.models_dir
 
         # Health insurance model:
         # Prefer a stable, short filename if present, otherwise fall back to the newest timestamped export.
@@ -43,8 +75,8 @@ class ModelsLoader:
                 reverse=True,
             )
             health_filename = health_candidates[0].name if health_candidates else "health_insurance_pipeline.pkl"
-        
-        model_files = {
+
+        return {
             "health_insurance": health_filename,
             'salary_regression': 'salary_regression_model(zeineb+eya).pkl',
             'remote_work': 'remote_work_v3(eya).pkl',
@@ -57,57 +89,296 @@ class ModelsLoader:
             'model_features': 'model_features.pkl',
             'model_features_jojo': 'model_features(jojo).pkl',
             'xgb_features_jojo': 'xgb_features(jojo).pkl',
+            'xgb_category_codes_jojo': 'xgb_category_codes(jojo).json',
+        }
+
+    @property
+    def model_files(self):
+        """Registry name -> filename mapping, resolved once (and again when the models directory changes)"""
+        if self._model_files is None:
+            self._model_files = self._resolve_model_files()
+        return self._model_files
+
+    def _get_lock(self, model_name):
+        """Per-model lock so concurrent first requests load a model only once"""
+        lock = self._locks.get(model_name)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(model_name, threading.Lock())
+        return lock
+
+    def _read_version(self, model_name, filename, previous=None):
+        """
+        Load one registered model file through the shared artifact cache (its native export when current)
+        Returns:
+            (ModelVersion, None) on success, (None, error message) on failure
+        """
+        model_path = self.models_dir / filename
+        if not model_path.exists():
+            return None, 'file not found'
+
+        start = time.perf_counter()
+        try:
+            signature = _file_signature(model_path)
+            # Same object as the predictors get: the native export when there is a current one
+            from .native import load_model_with_source
+            if model_path.suffix == '.json':
+                loaders = ('json',)
+            else:
+                loaders = MODEL_LOADERS.get(model_name, DEFAULT_LOADERS)
+            model, source_path = load_model_with_source(model_path, loaders)
+        except Exception as e:
+            return None, str(e)
+        load_time = time.perf_counter() - start
+
+        info = artifact_cache.info(source_path)
+        version = ModelVersion(
+            version=previous.version + 1 if previous is not None else 1,
+            filename=filename,
+            model=model,
+            digest=info.get('digest'),
+            signature=signature,
+            loaded_at=time.time(),
+            prepared={},
+        )
+        self._stats[model_name] = {
+            'filename': filename,
+            'loaded': True,
+            'version': version.version,
+            'loader': info.get('loader'),
+            'digest': version.digest,
+            'load_time_seconds': round(load_time, 4),
+            'size_bytes': signature[1],
+            'loaded_at': version.loaded_at,
         }
-        
-        for model_name, filename in model_files.items():
-            model_path = models_dir / filename
-            if not model_path.exists():
+        print(f"Loaded model with {info.get('loader')}: {model_name} v{version.version} ({filename}) in {load_time:.3f}s")
+        return version, None
+
+    def _load_model(self, model_name, filename):
+        """First load of a registered model; records its statistics"""
+        version, error = self._read_version(model_name, filename)
+        if version is None:
+            if error == 'file not found':
                 print(f"Model file not found: {filename}")
-                continue
+            else:
+                print(f"Failed to load model: {model_name} ({error})")
+            self._stats[model_name] = {'filename': filename, 'loaded': False, 'error': error}
+            return None
+        self._versions[model_name] = version
+        return version
+
+    def get_version(self, model_name):
+        """
+        Current ModelVersion of a model (loading it on first request), or None
+        Read it once per request to use one consistent model and digest throughout.
+        """
+        self._ensure_watching()
+        version = self._versions.get(model_name)
+        if version is not None:
+            return version
+
+        filename = self.model_files.get(model_name)
+        if filename is None:
+            return None
+
+        with self._get_lock(model_name):
+            if model_name in self._versions:
+                return self._versions[model_name]
+            # Do not retry a model that already failed to load (until its file changes)
+            if model_name in self._stats:
+                return None
+            return self._load_model(model_name, filename)
 
-            loaded = False
-            # Try pickle first
-            try:
-                with open(model_path, 'rb') as f:
-                    self._models[model_name] = pickle.load(f)
-                print(f"Loaded model with pickle: {model_name} ({filename})")
-                loaded = True
-            except Exception:
-                print(f"pickle.load failed for {model_name}, trying joblib/cloudpickle...")
-                traceback.print_exc()
-
-            # Try joblib if pickle failed
-            if not loaded and joblib is not None:
-                try:
-                    self._models[model_name] = joblib.load(model_path)
-                    print(f"Loaded model with joblib: {model_name} ({filename})")
-                    loaded = True
-                except Exception:
-                    print(f"joblib.load failed for {model_name}...")
-                    traceback.print_exc()
-
-            # Try cloudpickle as last resort
-            if not loaded and cloudpickle is not None:
-                try:
-                    with open(model_path, 'rb') as f:
-                        self._models[model_name] = cloudpickle.load(f)
-                    print(f"Loaded model with cloudpickle: {model_name} ({filename})")
-                    loaded = True
-                except Exception:
-                    print(f"cloudpickle.load failed for {model_name}...")
-                    traceback.print_exc()
-
-            if not loaded:
-                print(f"Failed to load model: {model_name}")
-    
     def get_model(self, model_name):
-        """Retrieve a loaded model by name"""
-        return self._models.get(model_name)
-    
+        """Retrieve a model by name, loading it on first request"""
+        version = self.get_version(model_name)
+        return version.model if version is not None else None
+
     def is_model_loaded(self, model_name):
         """Check if a model is loaded"""
-        return model_name in self._models
+        return model_name in self._versions
+
+    def get_model_stats(self, model_name=None):
+        """
+        Per-model load statistics (filename, version, loader, load time, file size)
+        Args:
+            model_name: Optional name to get a single model's stats
+        Returns:
+            Dictionary of stats, keyed by model name when no name is given
+        """
+        if model_name is not None:
+            return dict(self._stats.get(model_name, {}))
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+    # ==================== Prepared objects ====================
+
+    def add_preparer(self, model_name, key, prepare):
+        """
+        Register prepare(model) for a registered model: it builds an object derived from one
+        version (compiled evaluator, feature index, code table), kept with that version.
+        Built on first use, and for a reloaded version before it is swapped in.
+        """
+        self._preparers.setdefault(model_name, {})[key] = prepare
+
+    def prepared(self, model_name, version, key):
+        """Object registered under key (see add_preparer) for this version, built on first use"""
+        value = version.prepared.get(key, _MISSING)
+        if value is _MISSING:
+            with self._get_lock(f'{model_name}:{key}'):
+                value = version.prepared.get(key, _MISSING)
+                if value is _MISSING:
+                    value = self._preparers[model_name][key](version.model)
+                    version.prepared[key] = value
+        return value
+
+    def prepare_loaded(self):
+        """Build the registered objects of every loaded version (see preload_models)"""
+        for model_name, version in list(self._versions.items()):
+            for key in list(self._preparers.get(model_name, {})):
+                try:
+                    self.prepared(model_name, version, key)
+                except Exception as e:
+                    print(f"[WARNING] Could not prepare {key} for {model_name}: {e}")
+
+    def _prepare(self, model_name, version):
+        """Build every registered object of a new version before it serves requests"""
+        for key in list(self._preparers.get(model_name, {})):
+            self.prepared(model_name, version, key)
+
+    # ==================== Hot reload ====================
+
+    def _scan_models_dir(self):
+        """Manifest of the models directory: filename -> (mtime_ns, size)"""
+        manifest = {}
+        for path in self.models_dir.iterdir():
+            try:
+                if path.is_file():
+                    manifest[path.name] = _file_signature(path)
+            except OSError:
+                continue  # removed while scanning
+        return manifest
+
+    def check_for_updates(self):
+        """
+        Reload every loaded model whose file changed, or whose registry entry now points
+        to another file (e.g. a newer best_xgb_insurance_model_*.pkl)
+
+        A directory state is acted on once two consecutive checks see it unchanged, so a
+        file still being copied is not loaded half-written (copying to a temporary name
+        and renaming it into place avoids the question entirely). New versions are
+        loaded and prepared (see add_preparer) while the old ones keep serving, then
+        swapped in together, so files deployed together (a model and its feature list)
+        switch together; requests that already hold an old version finish on it. A
+        version that fails to load or prepare leaves the old one in place.
+
+        Returns:
+            List of model names that were swapped to a new version
+        """
+        with self._reload_lock:
+            manifest = self._scan_models_dir()
+            if manifest != self._pending_manifest:
+                # New or still changing: act on it once the next check sees the same state
+                self._pending_manifest = manifest
+                return []
+            if manifest == self._manifest:
+                return []
+
+            self._manifest = manifest
+            self._model_files = self._resolve_model_files()
+
+            staged = []
+            for model_name, filename in self.model_files.items():
+                with self._get_lock(model_name):
+                    current = self._versions.get(model_name)
+                    if current is None:
+                        # Failed or missing before: let the next request try the new file
+                        if not self._stats.get(model_name, {}).get('loaded', True) and filename in manifest:
+                            del self._stats[model_name]
+                        continue
+                    if filename == current.filename and manifest.get(filename) == current.signature:
+                        continue
+                    version = self._stage(model_name, filename, current)
+                    if version is not None:
+                        staged.append((model_name, current, version))
+
+            for model_name, current, version in staged:
+                self._versions[model_name] = version
+            digests_in_use = {version.digest for version in self._versions.values()}
+            for model_name, current, version in staged:
+                # The artifact cache would otherwise keep the old version alive for the whole process
+                if current.digest not in digests_in_use:
+                    artifact_cache.evict(current.digest)
+                print(f"[OK] Reloaded {model_name}: v{current.version} -> v{version.version} ({version.filename})")
+            return [model_name for model_name, _, _ in staged]
+
+    def _stage(self, model_name, filename, current):
+        """Load and prepare the new version of a loaded model; None when there is nothing to swap in"""
+        previous_stats = self._stats.get(model_name)
+        version, error = self._read_version(model_name, filename, previous=current)
+        if version is not None and version.digest == current.digest:
+            # Same content (file touched or copied over unchanged): keep the current version
+            self._versions[model_name] = current._replace(filename=filename, signature=version.signature)
+            self._stats[model_name] = dict(previous_stats or {}, filename=filename)
+            return None
+
+        if version is not None:
+            try:
+                self._prepare(model_name, version)
+            except Exception as e:
+                artifact_cache.evict(version.digest)
+                version, error = None, f'prepare failed: {e}'
+        if version is None:
+            self._stats[model_name] = dict(previous_stats or {}, reload_error=error)
+            print(f"[WARNING] Keeping {model_name} v{current.version}: could not load {filename} ({error})")
+            return None
+        return version
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.check_for_updates()
+            except Exception as e:
+                print(f"[WARNING] Model reload check failed: {e}")
+
+    def start_watching(self, interval=None):
+        """
+        Poll the models directory from a daemon thread in this process
+        Args:
+            interval: Seconds between checks (default: settings.ML_MODEL_RELOAD['POLL_SECONDS'])
+        """
+        with self._reload_lock:
+            if self._watcher_pid == os.getpid() and self._watcher is not None and self._watcher.is_alive():
+                return self._watcher
+            if interval is None:
+                config = get_setting('ML_MODEL_RELOAD', None) or {}
+                interval = config.get('POLL_SECONDS', DEFAULT_POLL_SECONDS)
+            self._watcher_pid = os.getpid()
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), name='models-reload-watcher', daemon=True
+            )
+            self._watcher.start()
+            return self._watcher
+
+    def defer_watching(self):
+        """
+        Do not start the watcher in this process (the gunicorn master); forked workers
+        start their own on first use
+        """
+        self._no_watch_pid = os.getpid()
+
+    def _ensure_watching(self):
+        """Start the watcher on first use when settings.ML_MODEL_RELOAD enables it (again after fork)"""
+        pid = os.getpid()
+        if self._watcher_pid == pid or self._no_watch_pid == pid:
+            return
+        config = get_setting('ML_MODEL_RELOAD', None) or {}
+        if not config.get('ENABLED', False):
+            # Checked once per process
+            self._no_watch_pid = pid
+            return
+        self.start_watching(config.get('POLL_SECONDS', DEFAULT_POLL_SECONDS))
 
 
-# Initialize the models loader
+# Initialize the models registry (models themselves load on first get_model call)
 models_loader = ModelsLoader()
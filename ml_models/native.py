@@ -0,0 +1,176 @@
+"""
+Native Model Formats
+Export pickled boosters to XGBoost UBJSON / LightGBM model text and load them back in preference to the pickle
+"""
+import json
+from pathlib import Path
+
+from sklearn.base import BaseEstimator, RegressorMixin
+
+from .artifacts import DEFAULT_LOADERS, artifact_cache
+
+# Pickled models that export_native_models converts by default
+NATIVE_EXPORTS = [
+    'xgboost_growth_model.pkl',
+    'xgb_classifier_model(jojo).pkl',
+    'growth_lgbm_pipeline(jojo).pkl',
+]
+
+MANIFEST_SUFFIX = '.native.json'
+
+
+def manifest_path(pkl_path):
+    """Manifest describing the native export of a pickled model (next to the pickle)"""
+    pkl_path = Path(pkl_path)
+    return pkl_path.with_name(pkl_path.stem + MANIFEST_SUFFIX)
+
+
+class BoosterRegressor(RegressorMixin, BaseEstimator):
+    """Stands in for a fitted LGBMRegressor as the final pipeline step, predicting with a native Booster"""
+
+    def __init__(self, booster=None):
+        self.booster = booster
+
+    @property
+    def booster_(self):
+        return self.booster
+
+    def __sklearn_is_fitted__(self):
+        return self.booster is not None
+
+    def fit(self, X, y=None):
+        raise NotImplementedError('BoosterRegressor wraps an already trained booster')
+
+    def predict(self, X):
+        return self.booster.predict(X)
+
+
+def _is_xgboost_model(model):
+    try:
+        from xgboost import XGBModel
+    except ImportError:
+        return False
+    return isinstance(model, XGBModel)
+
+
+def _is_lightgbm_model(model):
+    try:
+        from lightgbm import LGBMModel
+    except ImportError:
+        return False
+    return isinstance(model, LGBMModel)
+
+
+def export_model(pkl_path, model=None):
+    """
+    Write the native files and manifest for a pickled model
+    Args:
+        pkl_path: Path of the pickled model
+        model: The already-loaded model (loaded from pkl_path when omitted)
+    Returns:
+        The manifest dictionary
+    Raises:
+        ValueError for models without a native format
+    """
+    pkl_path = Path(pkl_path)
+    if model is None:
+        model = artifact_cache.load(pkl_path, loaders=('joblib', 'pickle'))
+    stem = pkl_path.stem
+    manifest = {'source': pkl_path.name, 'source_digest': artifact_cache.fingerprint(pkl_path)}
+
+    if _is_xgboost_model(model):
+        # The sklearn wrapper's save_model keeps its attributes (n_classes_, feature names) in the file
+        model_file = f'{stem}.ubj'
+        model.save_model(pkl_path.with_name(model_file))
+        manifest.update(format='xgboost', estimator=type(model).__name__, model=model_file)
+        classes = getattr(model, 'classes_', None)
+        if classes is not None:
+            manifest['classes'] = classes.tolist()
+
+    elif hasattr(model, 'steps') and _is_lightgbm_model(model.steps[-1][1]):
+        import joblib
+        from sklearn.pipeline import Pipeline
+
+        final_name, final_step = model.steps[-1]
+        model_file = f'{stem}.lgbm.txt'
+        prep_file = f'{stem}.prep.joblib'
+        final_step.booster_.save_model(pkl_path.with_name(model_file))
+        # Preprocessing steps (ColumnTransformer etc.) have no native format; they stay pickled, without the booster
+        joblib.dump(Pipeline(model.steps[:-1]), pkl_path.with_name(prep_file))
+        manifest.update(format='lightgbm_pipeline', model=model_file, preprocessing=prep_file,
+                        final_step=final_name)
+
+    elif _is_lightgbm_model(model):
+        model_file = f'{stem}.lgbm.txt'
+        model.booster_.save_model(pkl_path.with_name(model_file))
+        manifest.update(format='lightgbm', model=model_file)
+
+    else:
+        raise ValueError(f'No native format for {type(model).__name__} ({pkl_path.name})')
+
+    with open(manifest_path(pkl_path), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_native(path):
+    """artifact_cache loader for a native manifest"""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    model_path = path.with_name(manifest['model'])
+
+    if manifest['format'] == 'xgboost':
+        import numpy as np
+        import xgboost
+
+        model = getattr(xgboost, manifest['estimator'])()
+        model.load_model(model_path)
+        if 'classes' in manifest and not np.array_equal(getattr(model, 'classes_', None), manifest['classes']):
+            model.classes_ = np.asarray(manifest['classes'])
+        return model
+
+    if manifest['format'] == 'lightgbm_pipeline':
+        import joblib
+        import lightgbm
+        from sklearn.pipeline import Pipeline
+
+        prep = joblib.load(path.with_name(manifest['preprocessing']))
+        booster = lightgbm.Booster(model_file=str(model_path))
+        return Pipeline(prep.steps + [(manifest['final_step'], BoosterRegressor(booster))])
+
+    if manifest['format'] == 'lightgbm':
+        import lightgbm
+        return BoosterRegressor(lightgbm.Booster(model_file=str(model_path)))
+
+    raise ValueError(f"Unknown native format '{manifest['format']}' in {path.name}")
+
+
+def load_model(pkl_path, loaders=DEFAULT_LOADERS):
+    """
+    Load a model, preferring its native export when one exists for the current pickle
+    Falls back to the pickle when there is no manifest, the pickle changed after the
+    export (digest mismatch) or the native files cannot be loaded.
+    """
+    return load_model_with_source(pkl_path, loaders)[0]
+
+
+def load_model_with_source(pkl_path, loaders=DEFAULT_LOADERS):
+    """
+    Same as load_model
+    Returns:
+        Tuple of (model, path of the file actually loaded: the manifest or the pickle),
+        so callers can look up its artifact_cache.info()
+    """
+    pkl_path = Path(pkl_path)
+    native = manifest_path(pkl_path)
+    if native.exists() and pkl_path.exists():
+        try:
+            with open(native, 'r', encoding='utf-8') as f:
+                source_digest = json.load(f).get('source_digest')
+            if source_digest == artifact_cache.fingerprint(pkl_path):
+                return artifact_cache.load(native, loaders=('native',)), native
+            print(f"[WARNING] {native.name} is stale ({pkl_path.name} changed); loading the pickle")
+        except Exception as e:
+            print(f"[WARNING] Could not load native export {native.name}: {e}")
+    return artifact_cache.load(pkl_path, loaders=loaders), pkl_path
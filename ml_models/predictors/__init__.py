@@ -1,16 +1,10 @@
 """
 ML Models Predictors Package
-Import all predictors for easy access
+Access all predictors by name; each one is imported (and its models loaded) on first access
 """
-from .salary_predictor import salary_predictor
-from .job_title_predictor import job_title_predictor
-from .remote_work_predictor import remote_work_predictor
-from .degree_predictor import degree_predictor
-from .benefits_predictor import benefits_predictor
-from .company_growth_predictor import company_growth_predictor
-from .revenue_growth_predictor import revenue_growth_predictor
-from .campaign_conversion_predictor import campaign_conversion_predictor
-from .xgboost_growth_predictor import xgboost_growth_predictor
+import importlib
+import sys
+import types
 
 __all__ = [
     'salary_predictor',
@@ -23,3 +17,32 @@ __all__ = [
     'campaign_conversion_predictor',
     'xgboost_growth_predictor',
 ]
+
+
+def __getattr__(name):
+    """PEP 562: import the predictor's module the first time its singleton is requested"""
+    if name in __all__:
+        # Importing the submodule binds it on this package, which swaps in its singleton
+        importlib.import_module(f'{__name__}.{name}')
+        return globals()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _PredictorsPackage(types.ModuleType):
+    """
+    Each singleton has the same name as its module. The import system binds a loaded
+    submodule on its package; keep the singleton there instead, as the eager
+    `from .x import x` imports did, whichever way the module got imported first.
+    """
+
+    def __setattr__(self, name, value):
+        if name in __all__ and isinstance(value, types.ModuleType) and hasattr(value, name):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _PredictorsPackage
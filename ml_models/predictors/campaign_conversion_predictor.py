@@ -5,23 +5,63 @@ Predicts whether marketing campaigns will have high or low conversion rates
 import pandas as pd
 import numpy as np
 from ..models_loader import models_loader
+from ..batching import batched_predict_with_proba
+
+
+# Model categorical columns and the input key each one is read from
+CATEGORICAL_INPUTS = [
+    ('Company', 'company'),
+    ('Campaign_Type', 'campaign_type'),
+    ('Target_Audience', 'target_audience'),
+    ('Channel_Used', 'channel_used'),
+    ('Location', 'location'),
+    ('Language', 'language'),
+    ('Customer_Segment', 'customer_segment'),
+]
+
+
+class _OneHotIndex:
+    """Maps (column, value) -> feature index for one-hot names like 'Channel_Used_Email'"""
+    
+    def __init__(self, model, feature_names):
+        self.model = model
+        self.feature_names = feature_names
+        self.duration_index = None
+        self.index = {}
+        
+        # Longest prefix first so one column name never shadows another
+        columns = sorted((col for col, _ in CATEGORICAL_INPUTS), key=len, reverse=True)
+        for idx, name in enumerate(feature_names):
+            if name == 'Duration':
+                self.duration_index = idx
+                continue
+            for column in columns:
+                if name.startswith(column + '_'):
+                    self.index[(column, name[len(column) + 1:])] = idx
+                    break
 
 
 class CampaignConversionPredictor:
     """Campaign conversion prediction handler"""
     
     def __init__(self):
-        self.model = models_loader.get_model('campaign_conversion')
-        self.scaler = models_loader.get_model('campaign_scaler')
-        
-        # If scaler doesn't exist, create a simple one based on typical campaign durations
+        # If scaler doesn't exist, fall back to a simple scaling based on typical campaign durations
         # Assuming typical campaigns range from 1-90 days with mean ~30
-        if self.scaler is None:
-            print("WARNING: Scaler not found, using default scaling for Duration")
-            # We'll use manual scaling: (x - mean) / std
-            # Based on typical campaign data: mean=30, std=20
-            self.duration_mean = 30.0
-            self.duration_std = 20.0
+        # We'll use manual scaling: (x - mean) / std
+        # Based on typical campaign data: mean=30, std=20
+        self.duration_mean = 30.0
+        self.duration_std = 20.0
+        self._encoder = None
+    
+    @property
+    def model(self):
+        """Campaign model, loaded by the registry on first use"""
+        return models_loader.get_model('campaign_conversion')
+    
+    @property
+    def scaler(self):
+        """Optional Duration scaler, loaded by the registry on first use"""
+        return models_loader.get_model('campaign_scaler')
     
     def predict(self, input_data):
         """
@@ -39,21 +79,26 @@ class CampaignConversionPredictor:
         Returns:
             Dictionary with prediction results
         """
-        # Check if model is loaded
-        if self.model is None:
+        # Check if model is loaded (one registry read, so a reload cannot swap it mid-request)
+        model = self.model
+        if model is None:
             return {'error': 'Campaign conversion prediction model is not available'}
         
         try:
             # Prepare features
-            features = self._prepare_features(input_data)
+            features = self._prepare_features(input_data, model)
             
-            # Make prediction
-            prediction = self.model.predict(features)[0]
-            prediction_proba = self.model.predict_proba(features)[0]
+            # Make prediction (single model pass for label and probabilities,
+            # shared with concurrent requests when micro-batching is enabled)
+            labels, probabilities = batched_predict_with_proba(
+                'campaign_conversion', lambda: model, features
+            )
+            prediction = labels[0]
+            prediction_proba = probabilities[0]
             
             # Convert to label
             prediction_label = 'High' if prediction == 1 else 'Low'
-            confidence = float(prediction_proba[prediction]) * 100
+            confidence = float(prediction_proba.max()) * 100
             
             # Get recommendations
             recommendations = self._generate_recommendations(
@@ -77,70 +122,64 @@ class CampaignConversionPredictor:
         except Exception as e:
             return {'error': f'Prediction error: {str(e)}'}
     
-    def _prepare_features(self, input_data):
+    def _prepare_features(self, input_data, model=None):
         """
         Prepare features for the model
         The model expects one-hot encoded categorical features with scaled Duration
         """
-        # Create a DataFrame with the input (including Company and Location)
-        df = pd.DataFrame([{
-            'Company': input_data.get('company', ''),
-            'Campaign_Type': input_data.get('campaign_type', ''),
-            'Target_Audience': input_data.get('target_audience', ''),
-            'Channel_Used': input_data.get('channel_used', ''),
-            'Location': input_data.get('location', ''),
-            'Language': input_data.get('language', ''),
-            'Customer_Segment': input_data.get('customer_segment', ''),
-            'Duration': int(input_data.get('duration', 30))
-        }])
-        
-        print(f"DEBUG - Input data: {input_data}")
-        
-        # Define categorical columns (including Company and Location)
-        categorical_cols = ['Company', 'Campaign_Type', 'Target_Audience', 
-                          'Channel_Used', 'Location', 'Language', 'Customer_Segment']
-        
-        # One-hot encode WITHOUT drop_first (model was trained this way)
-        df_encoded = pd.get_dummies(df, columns=categorical_cols, drop_first=False)
-        
-        print(f"DEBUG - Encoded features: {df_encoded.columns.tolist()}")
-        print(f"DEBUG - Duration before scaling: {df_encoded['Duration'].values[0]}")
-        
-        # Get expected features from the model
-        if hasattr(self.model, 'feature_names_in_'):
-            expected_features = list(self.model.feature_names_in_)
-            print(f"DEBUG - Model expects {len(expected_features)} features")
-        else:
-            expected_features = df_encoded.columns.tolist()
-        
-        # Scale Duration BEFORE aligning features
-        if 'Duration' in df_encoded.columns:
-            original_duration = df_encoded['Duration'].values[0]
-            if self.scaler is not None:
-                try:
-                    df_encoded['Duration'] = self.scaler.transform(df_encoded[['Duration']])
-                    print(f"DEBUG - Duration scaled from {original_duration} to {df_encoded['Duration'].values[0]}")
-                except Exception as e:
-                    print(f"DEBUG - Scaling failed: {e}")
-                    df_encoded['Duration'] = (df_encoded['Duration'] - 30) / 20
-            else:
-                # Manual scaling if no scaler
-                df_encoded['Duration'] = (df_encoded['Duration'] - 30) / 20
-                print(f"DEBUG - Duration manually scaled from {original_duration} to {df_encoded['Duration'].values[0]}")
-        
-        # Create final DataFrame with all expected features
-        final_df = pd.DataFrame(columns=expected_features)
-        for col in expected_features:
-            if col in df_encoded.columns:
-                final_df[col] = df_encoded[col].values
-            else:
-                final_df[col] = 0
+        return self._prepare_features_batch([input_data], model)
+    
+    def _prepare_features_batch(self, records, model=None):
+        """
+        Encode many campaigns into an N x F feature frame in one pass
+        
+        Equivalent to pd.get_dummies (no drop_first) aligned to the model's
+        feature_names_in_, but each (column, value) pair is looked up in a
+        precompiled index and written straight into a preallocated matrix.
+        """
+        encoder = self._get_encoder(model)
+        matrix = np.zeros((len(records), len(encoder.feature_names)))
+        
+        # Scale Duration for all rows at once
+        if encoder.duration_index is not None:
+            durations = np.array([int(r.get('duration', 30)) for r in records], dtype=float)
+            matrix[:, encoder.duration_index] = self._scale_duration(durations)
         
-        print(f"DEBUG - Final shape: {final_df.shape}")
-        non_zero = [(col, val) for col, val in final_df.iloc[0].items() if val != 0]
-        print(f"DEBUG - Active features: {non_zero}")
+        # Set the one-hot indicator of every known category value
+        index = encoder.index
+        for row, record in enumerate(records):
+            for column, key in CATEGORICAL_INPUTS:
+                idx = index.get((column, str(record.get(key, ''))))
+                if idx is not None:
+                    matrix[row, idx] = 1.0
         
-        return final_df
+        # Single-block frame so the model still sees its feature names
+        return pd.DataFrame(matrix, columns=encoder.feature_names)
+    
+    def _scale_duration(self, durations):
+        """Scale an array of durations with the fitted scaler, or the default mean/std"""
+        scaler = self.scaler
+        if scaler is not None:
+            try:
+                scaled = scaler.transform(pd.DataFrame({'Duration': durations}))
+                return np.asarray(scaled, dtype=float).ravel()
+            except Exception as e:
+                print(f"DEBUG - Scaling failed: {e}")
+        return (durations - self.duration_mean) / self.duration_std
+    
+    def _get_encoder(self, model=None):
+        """One-hot index compiled from the given (default: current) model's feature names"""
+        if model is None:
+            model = self.model
+        encoder = self._encoder
+        if encoder is None or encoder.model is not model:
+            if hasattr(model, 'feature_names_in_'):
+                feature_names = list(model.feature_names_in_)
+            else:
+                feature_names = self._get_all_possible_features()
+            encoder = _OneHotIndex(model, feature_names)
+            self._encoder = encoder
+        return encoder
     
     def _get_all_possible_features(self):
         """
@@ -2,57 +2,29 @@
 Company Revenue Growth Predictor
 Predicts revenue growth percentage for employers using LightGBM pipeline
 """
-import pickle
 import pandas as pd
 import numpy as np
-from pathlib import Path
+from ..models_loader import models_loader
+from ..backends import register_model, run_model
 
 
 class CompanyGrowthPredictor:
     """Predicts company revenue growth percentage"""
     
     def __init__(self):
-        """Load the LightGBM pipeline and features"""
-        self.pipeline = None
-        self.features = None
-        self._load_model()
+        """Declare the pipeline for the inference backend; the registry loads it and the features on first use"""
+        pipeline_path = models_loader.models_dir / models_loader.model_files['growth_lgbm']
+        self.spec = register_model('company_growth', pipeline_path, ('joblib', 'pickle'))
     
-    def _load_model(self):
-        """Load the LightGBM pipeline and feature list"""
-        try:
-            models_dir = Path(__file__).parent.parent / 'models'
-            pipeline_path = models_dir / 'growth_lgbm_pipeline(jojo).pkl'
-            features_path = models_dir / 'model_features(jojo).pkl'
-            
-            if pipeline_path.exists() and features_path.exists():
-                # Try loading with different pickle protocols for compatibility
-                try:
-                    with open(pipeline_path, 'rb') as f:
-                        self.pipeline = pickle.load(f, encoding='latin1')
-                except Exception as e1:
-                    print(f"First attempt failed: {e1}")
-                    try:
-                        import joblib
-                        self.pipeline = joblib.load(pipeline_path)
-                    except Exception as e2:
-                        print(f"Joblib attempt failed: {e2}")
-                        # Try one more time with pickle protocol 4
-                        with open(pipeline_path, 'rb') as f:
-                            self.pipeline = pickle.load(f, fix_imports=True, encoding='bytes')
-                
-                with open(features_path, 'rb') as f:
-                    self.features = pickle.load(f)
-                print(f"[OK] Company growth model loaded with {len(self.features)} features: {self.features}")
-            else:
-                print(f"✗ Model files not found at {models_dir}")
-                if not pipeline_path.exists():
-                    print(f"  Missing: {pipeline_path}")
-                if not features_path.exists():
-                    print(f"  Missing: {features_path}")
-        except Exception as e:
-            print(f"✗ Error loading company growth model: {e}")
-            import traceback
-            traceback.print_exc()
+    @property
+    def pipeline(self):
+        """LightGBM pipeline (native booster export when current), loaded by the registry on first use"""
+        return models_loader.get_model('growth_lgbm')
+    
+    @property
+    def features(self):
+        """Feature names of the current model_features(jojo).pkl"""
+        return models_loader.get_model('model_features_jojo')
     
     def predict(self, input_data):
         """
@@ -62,136 +34,176 @@ class CompanyGrowthPredictor:
         Returns:
             Dictionary with prediction results
         """
-        # Check if model is loaded
-        if self.pipeline is None or self.features is None:
-            return {
+        return self.predict_batch([input_data])[0]
+    
+    def predict_batch(self, records):
+        """
+        Predict revenue growth for a whole portfolio with one pipeline call
+        Args:
+            records: List of input dictionaries (same keys as predict)
+        Returns:
+            List of result dictionaries aligned with records
+        """
+        # One registry read per file: the whole batch uses these versions, even if a reload swaps them meanwhile
+        version = models_loader.get_version('growth_lgbm')
+        features = self.features
+        if version is None or features is None:
+            return [{
                 'success': False,
                 'error': 'Company growth prediction model is not available'
-            }
+            } for _ in records]
         
-        try:
-            # Validate and convert inputs
-            workers = float(input_data.get('workers', 0))
-            previous_workers = float(input_data.get('previous_workers', 0))
-            revenue = float(input_data.get('revenue', 0))
-            delta_workers = float(input_data.get('delta_workers', 0))
-            founded = int(input_data.get('founded', 2000))
-            industry = input_data.get('industry', '')
+        results = [None] * len(records)
+        valid = []
+        rows = []
+        
+        for i, input_data in enumerate(records):
+            try:
+                # Validate and convert inputs
+                row = (
+                    float(input_data.get('workers', 0)),
+                    float(input_data.get('previous_workers', 0)),
+                    float(input_data.get('revenue', 0)),
+                    # Not a model feature, but a non-numeric value is still an input error
+                    float(input_data.get('delta_workers', 0)),
+                    int(input_data.get('founded', 2000)),
+                    input_data.get('industry', ''),
+                )
+            except (ValueError, TypeError) as e:
+                results[i] = {'success': False, 'error': f'Prediction failed: {str(e)}'}
+                continue
             
             # Validate inputs
-            if workers <= 0 or previous_workers <= 0 or revenue <= 0:
-                return {
+            if row[0] <= 0 or row[1] <= 0 or row[2] <= 0:
+                results[i] = {
                     'success': False,
                     'error': 'Workers, previous workers, and revenue must be positive numbers'
                 }
+                continue
+            
+            valid.append(i)
+            rows.append(row)
+        
+        if not valid:
+            return results
+        
+        try:
+            workers, previous_workers, revenue, _, founded, industries = zip(*rows)
+            workers = np.array(workers)
+            previous_workers = np.array(previous_workers)
             
-            # Engineer features
-            features_df = self._engineer_features(
-                workers, previous_workers, revenue, delta_workers, founded, industry
+            # Engineer features for all rows
+            features_df = self._engineer_features_batch(
+                workers, previous_workers, np.array(revenue), np.array(founded), industries, features
             )
             
             # Make prediction (log-transformed)
-            prediction_log = self.pipeline.predict(features_df)[0]
+            prediction_log = run_model(
+                self.spec, 'predict', features_df, lambda: version.model, digest=version.digest
+            )
             
             # Inverse transform to get actual growth percentage
-            growth_percentage = np.sign(prediction_log) * np.expm1(np.abs(prediction_log))
-            
-            # SANITY CHECK: If workforce is declining significantly, cap the growth prediction
-            # This is a temporary fix until the model is retrained
-            workforce_change_pct = (workers - previous_workers) / previous_workers if previous_workers > 0 else 0
-            
-            if workforce_change_pct < -0.1:  # More than 10% workforce decline
-                # Cap growth at 0 or make it proportional to workforce decline
-                max_growth = max(0, workforce_change_pct * 50)  # Scale down
-                if growth_percentage > max_growth:
-                    print(f"WARNING: Model predicted {growth_percentage:.2f}% growth with {workforce_change_pct*100:.1f}% workforce decline.")
-                    print(f"         Capping prediction to {max_growth:.2f}% (model needs retraining)")
-                    growth_percentage = max_growth
-            
-            # Categorize growth
-            interpretation = self._categorize_growth(growth_percentage)
-            
-            return {
-                'success': True,
-                'growth_percentage': float(growth_percentage),
-                'growth_percentage_formatted': f"{growth_percentage:.2f}%",
-                'interpretation': interpretation
-            }
+            growth = np.sign(prediction_log) * np.expm1(np.abs(prediction_log))
+            growth = self._cap_for_workforce_decline(growth, workers, previous_workers)
         
         except Exception as e:
             import traceback
             traceback.print_exc()
-            return {
-                'success': False,
-                'error': f'Prediction failed: {str(e)}'
+            for i in valid:
+                results[i] = {'success': False, 'error': f'Prediction failed: {str(e)}'}
+            return results
+        
+        for row, i in enumerate(valid):
+            growth_percentage = float(growth[row])
+            results[i] = {
+                'success': True,
+                'growth_percentage': growth_percentage,
+                'growth_percentage_formatted': f"{growth_percentage:.2f}%",
+                # Categorize growth
+                'interpretation': self._categorize_growth(growth_percentage)
             }
+        
+        return results
+    
+    def _cap_for_workforce_decline(self, growth, workers, previous_workers):
+        """
+        SANITY CHECK: If workforce is declining significantly, cap the growth prediction
+        This is a temporary fix until the model is retrained
+        """
+        workforce_change_pct = (workers - previous_workers) / previous_workers
+        
+        # More than 10% workforce decline: cap growth at 0 or make it proportional to the decline
+        max_growth = np.maximum(0, workforce_change_pct * 50)  # Scale down
+        capped = (workforce_change_pct < -0.1) & (growth > max_growth)
+        
+        for row in np.flatnonzero(capped):
+            print(f"WARNING: Model predicted {growth[row]:.2f}% growth with {workforce_change_pct[row]*100:.1f}% workforce decline.")
+            print(f"         Capping prediction to {max_growth[row]:.2f}% (model needs retraining)")
+        
+        return np.where(capped, max_growth, growth)
     
     def _engineer_features(self, workers, previous_workers, revenue, delta_workers, founded, industry):
         """Engineer features matching training data"""
+        return self._engineer_features_batch(
+            np.array([float(workers)]), np.array([float(previous_workers)]),
+            np.array([float(revenue)]), np.array([int(founded)]), [industry], self.features
+        )
+    
+    def _engineer_features_batch(self, workers, previous_workers, revenue, founded, industries, features=None):
+        """
+        Engineer features for many companies as NumPy column operations
+        Args:
+            workers, previous_workers, revenue: float arrays
+            founded: int array of founding years
+            industries: sequence of industry names
+            features: Training feature order (model_features(jojo).pkl)
+        Returns:
+            DataFrame in training feature order (industry_top kept as string)
+        """
         from datetime import datetime
         
-        # Ensure all numeric inputs are floats
-        workers = float(workers)
-        previous_workers = float(previous_workers)
-        revenue = float(revenue)
-        delta_workers = float(delta_workers)
-        founded = int(founded)
-        
         # Calculate InitialRevenue (revenue at previous period based on growth rate assumption)
         # Assuming revenue grew proportionally with workers
-        if workers > 0:
-            revenue_per_worker = revenue / workers
-            initial_revenue = revenue_per_worker * previous_workers
-        else:
-            initial_revenue = revenue
+        has_workers = workers > 0
+        revenue_per_worker = np.divide(revenue, workers, out=np.zeros_like(revenue), where=has_workers)
+        initial_revenue = np.where(has_workers, revenue_per_worker * previous_workers, revenue)
         
         # Calculate logarithmic transformations (adding small epsilon to avoid log(0))
         epsilon = 1e-10
-        workers_log = float(np.log1p(workers + epsilon))
-        rev_log = float(np.log1p(revenue + epsilon))
-        init_log = float(np.log1p(initial_revenue + epsilon))
+        workers_log = np.log1p(workers + epsilon)
+        rev_log = np.log1p(revenue + epsilon)
+        init_log = np.log1p(initial_revenue + epsilon)
         
         # Calculate worker growth ratio
-        if previous_workers > 0:
-            worker_growth = float((workers - previous_workers) / previous_workers)
-        else:
-            worker_growth = 0.0
+        has_previous = previous_workers > 0
+        worker_growth = np.divide(
+            workers - previous_workers, previous_workers,
+            out=np.zeros_like(workers), where=has_previous
+        )
         
         # Calculate company age
         current_year = datetime.now().year
-        age = int(current_year - founded)
+        age = (current_year - founded).astype(np.float64)
         
         # Keep industry as string for the pipeline's OneHotEncoder
-        # Determine if industry is in top category - but pass the actual string
-        industry_top = industry if industry else 'Other'
-        
-        # Create DataFrame with engineered features in the correct order
-        # Note: industry_top should be a STRING for the OneHotEncoder in the pipeline
-        features_dict = {
-            'workers': float(workers),
-            'previous_workers': float(previous_workers),
-            'InitialRevenue': float(initial_revenue),
-            'workers_log': float(workers_log),
-            'rev_log': float(rev_log),
-            'init_log': float(init_log),
-            'worker_growth': float(worker_growth),
-            'age': float(age),
-            'industry_top': industry_top  # Keep as string for OneHotEncoder
-        }
-        
-        # Create DataFrame - do NOT force dtype for industry_top (it's categorical)
-        features_df = pd.DataFrame([features_dict])
+        industry_top = [industry if industry else 'Other' for industry in industries]
+        
+        # Numeric columns as float64, industry_top as object/string
+        features_df = pd.DataFrame({
+            'workers': workers.astype(np.float64),
+            'previous_workers': previous_workers.astype(np.float64),
+            'InitialRevenue': initial_revenue,
+            'workers_log': workers_log,
+            'rev_log': rev_log,
+            'init_log': init_log,
+            'worker_growth': worker_growth,
+            'age': age,
+            'industry_top': industry_top,
+        })
         
         # Reorder columns to match training features
-        if self.features:
-            features_df = features_df[self.features]
-        
-        # Convert numeric columns to float64, but keep industry_top as object/string
-        numeric_cols = ['workers', 'previous_workers', 'InitialRevenue', 'workers_log', 
-                       'rev_log', 'init_log', 'worker_growth', 'age']
-        for col in numeric_cols:
-            if col in features_df.columns:
-                features_df[col] = features_df[col].astype(np.float64)
+        if features:
+            features_df = features_df[features]
         
         return features_df
     
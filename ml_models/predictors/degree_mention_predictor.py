@@ -5,40 +5,40 @@ Target: job_no_degree_mention
   - 1 = No degree mentioned (No Degree Required)
   - 0 = Degree mentioned (Degree Required)
 """
-import pickle
 import pandas as pd
-from pathlib import Path
-from sklearn.preprocessing import LabelEncoder
+from ..models_loader import models_loader
+from ..compiled_trees import compile_if_enabled
+from ..category_codes import CategoryCodeTable
+from ..classifiers import predict_with_proba
 
 
 class DegreeMentionPredictor:
     """Predicts if a job posting mentions degree requirements"""
     
     def __init__(self):
-        """Load the XGBoost model and features"""
-        self.model = None
-        self.features = None
-        self._load_model()
+        """Register the per-version objects; the registry loads the model, features and code table on first use"""
+        # Shared with DegreePredictor: one compiled evaluator and code table per file version
+        models_loader.add_preparer(
+            'xgb_classifier', 'compiled', lambda model: compile_if_enabled(model, 'xgb_classifier')
+        )
+        models_loader.add_preparer('xgb_category_codes_jojo', 'table', CategoryCodeTable.from_dict)
     
-    def _load_model(self):
-        """Load the XGBoost classifier and feature list"""
-        try:
-            models_dir = Path(__file__).parent.parent / 'models'
-            model_path = models_dir / 'xgb_classifier_model(jojo).pkl'
-            features_path = models_dir / 'xgb_features(jojo).pkl'
-            
-            if model_path.exists() and features_path.exists():
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(features_path, 'rb') as f:
-                    self.features = pickle.load(f)
-                print(f"[OK] Degree mention model loaded with {len(self.features)} features: {self.features}")
-            else:
-                print(f"✗ Model files not found at {models_dir}")
-        except Exception as e:
-            print(f"✗ Error loading degree mention model: {e}")
-            import traceback
-            traceback.print_exc()
+    @property
+    def model(self):
+        """XGBoost classifier, loaded by the registry on first use"""
+        return models_loader.get_model('xgb_classifier')
+    
+    @property
+    def features(self):
+        """Feature names of the current xgb_features(jojo).pkl"""
+        return models_loader.get_model('xgb_features_jojo')
+    
+    def _get_category_codes(self):
+        """Category -> code table fitted on the training categories (all categories unknown without the file)"""
+        version = models_loader.get_version('xgb_category_codes_jojo')
+        if version is None:
+            return CategoryCodeTable()
+        return models_loader.prepared('xgb_category_codes_jojo', version, 'table')
     
     def predict(self, input_data):
         """
@@ -65,23 +65,23 @@ class DegreeMentionPredictor:
         if errors:
             return {'success': False, 'error': ', '.join(errors)}
         
-        # Check model loaded
-        if self.model is None or self.features is None:
+        # One registry read per file: the whole request uses these versions, even if a reload swaps them meanwhile
+        version = models_loader.get_version('xgb_classifier')
+        features = self.features
+        if version is None or features is None:
             return {'success': False, 'error': 'Model not available'}
         
         try:
             # Prepare features
-            features_df = self._prepare_features(input_data)
+            features_df = self._prepare_features(input_data, features, self._get_category_codes())
             
-            # Make prediction
-            prediction = self.model.predict(features_df)[0]
+            # Make prediction (single model pass for label and probabilities)
+            model = models_loader.prepared('xgb_classifier', version, 'compiled')
+            labels, probabilities = predict_with_proba(model, features_df)
+            prediction = labels[0]
             
             # Get confidence
-            try:
-                probabilities = self.model.predict_proba(features_df)[0]
-                confidence = max(probabilities) * 100
-            except:
-                confidence = None
+            confidence = max(probabilities[0]) * 100 if probabilities is not None else None
             
             # Interpret result
             # After testing, the model appears to predict:
@@ -123,12 +123,14 @@ class DegreeMentionPredictor:
         
         return errors
     
-    def _prepare_features(self, input_data):
+    def _prepare_features(self, input_data, features, category_codes):
         """
         Prepare feature DataFrame with proper encoding
         
         Args:
             input_data: dict with feature values
+            features: Feature names in model order
+            category_codes: CategoryCodeTable of the training categories
         
         Returns:
             pandas DataFrame ready for prediction
@@ -144,7 +146,7 @@ class DegreeMentionPredictor:
         }
         
         # Create DataFrame in correct feature order
-        df = pd.DataFrame([feature_dict], columns=self.features)
+        df = pd.DataFrame([feature_dict], columns=features)
         
         # Encode categorical features to numeric
         categorical_cols = ['job_title_short', 'job_via', 'company_name', 
@@ -152,8 +154,8 @@ class DegreeMentionPredictor:
         
         for col in categorical_cols:
             if col in df.columns:
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
+                # Lookup in the persisted training code table
+                df[col] = category_codes.encode_many(col, df[col].values)
         
         return df
 
@@ -2,50 +2,40 @@
 Degree Requirement Prediction Module
 Predicts whether a job posting requires a degree using XGBoost classifier
 """
-import os
-import pickle
 import pandas as pd
-from pathlib import Path
+from ..models_loader import models_loader
+from ..compiled_trees import compile_if_enabled
+from ..category_codes import CategoryCodeTable
+from ..classifiers import predict_with_proba
 
 
 class DegreePredictor:
     """Degree requirement prediction handler using XGBoost"""
     
     def __init__(self):
-        """Load the XGBoost model and feature list"""
-        self.model = None
-        self.features = None
-        self._load_model()
+        """Register the per-version objects; the registry loads the model, features and code table on first use"""
+        # Shared with DegreeMentionPredictor: one compiled evaluator and code table per file version
+        models_loader.add_preparer(
+            'xgb_classifier', 'compiled', lambda model: compile_if_enabled(model, 'xgb_classifier')
+        )
+        models_loader.add_preparer('xgb_category_codes_jojo', 'table', CategoryCodeTable.from_dict)
     
-    def _load_model(self):
-        """Load the XGBoost classifier model and features from pkl files"""
-        try:
-            models_dir = Path(__file__).parent.parent / 'models'
-            model_path = models_dir / 'xgb_classifier_model(jojo).pkl'
-            features_path = models_dir / 'xgb_features(jojo).pkl'
-            
-            print(f"Looking for model in: {models_dir}")
-            print(f"Model path: {model_path}")
-            print(f"Features path: {features_path}")
-            print(f"Model exists: {model_path.exists()}")
-            print(f"Features exists: {features_path.exists()}")
-            
-            if model_path.exists() and features_path.exists():
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                with open(features_path, 'rb') as f:
-                    self.features = pickle.load(f)
-                print(f"Degree prediction model loaded successfully with {len(self.features)} features")
-            else:
-                print(f"Model files not found at {models_dir}")
-                if not model_path.exists():
-                    print(f"Missing: {model_path}")
-                if not features_path.exists():
-                    print(f"Missing: {features_path}")
-        except Exception as e:
-            print(f"Error loading degree prediction model: {e}")
-            import traceback
-            traceback.print_exc()
+    @property
+    def model(self):
+        """XGBoost classifier, loaded by the registry on first use"""
+        return models_loader.get_model('xgb_classifier')
+    
+    @property
+    def features(self):
+        """Feature names of the current xgb_features(jojo).pkl"""
+        return models_loader.get_model('xgb_features_jojo')
+    
+    def _get_category_codes(self):
+        """Category -> code table fitted on the training categories (all categories unknown without the file)"""
+        version = models_loader.get_version('xgb_category_codes_jojo')
+        if version is None:
+            return CategoryCodeTable()
+        return models_loader.prepared('xgb_category_codes_jojo', version, 'table')
     
     def predict(self, input_data):
         """
@@ -58,13 +48,10 @@ class DegreePredictor:
         Returns:
             Dictionary with prediction results
         """
-        # Reload model if not loaded (can happen after Django auto-reload)
-        if self.model is None or self.features is None:
-            print("Model not loaded, attempting to reload...")
-            self._load_model()
-        
-        # Check if model is loaded
-        if self.model is None or self.features is None:
+        # One registry read per file: the whole request uses these versions, even if a reload swaps them meanwhile
+        version = models_loader.get_version('xgb_classifier')
+        features = self.features
+        if version is None or features is None:
             return {
                 'error': 'Degree prediction model is not available. Please check model files.',
                 'success': False
@@ -77,17 +64,15 @@ class DegreePredictor:
         
         try:
             # Prepare features for prediction
-            features_df = self._prepare_features(input_data)
+            features_df = self._prepare_features(input_data, features, self._get_category_codes())
             
-            # Make prediction
-            prediction = self.model.predict(features_df)[0]
+            # Make prediction (single model pass for label and probabilities)
+            model = models_loader.prepared('xgb_classifier', version, 'compiled')
+            labels, probabilities = predict_with_proba(model, features_df)
+            prediction = labels[0]
             
             # Get prediction probability if available
-            try:
-                probability = self.model.predict_proba(features_df)[0]
-                confidence = max(probability) * 100
-            except:
-                confidence = None
+            confidence = max(probabilities[0]) * 100 if probabilities is not None else None
             
             # Format result
             result = {
@@ -124,18 +109,18 @@ class DegreePredictor:
         
         return errors
     
-    def _prepare_features(self, input_data):
+    def _prepare_features(self, input_data, features, category_codes):
         """
         Prepare feature DataFrame for model input
         
         Args:
             input_data: Dictionary with feature values
+            features: Feature names in model order
+            category_codes: CategoryCodeTable of the training categories
             
         Returns:
             pandas DataFrame with features in correct order
         """
-        from sklearn.preprocessing import LabelEncoder
-        
         # Create a dictionary with all features
         feature_dict = {
             'skill_count': int(input_data['skill_count']),
@@ -147,16 +132,15 @@ class DegreePredictor:
         }
         
         # Create DataFrame with features in the correct order
-        features_df = pd.DataFrame([feature_dict], columns=self.features)
+        features_df = pd.DataFrame([feature_dict], columns=features)
         
         # Encode categorical features to numeric
         categorical_columns = ['job_title_short', 'job_via', 'company_name', 'job_country', 'search_location']
         
         for col in categorical_columns:
             if col in features_df.columns:
-                le = LabelEncoder()
-                # Fit and transform in one step
-                features_df[col] = le.fit_transform(features_df[col].astype(str))
+                # Lookup in the persisted training code table
+                features_df[col] = category_codes.encode_many(col, features_df[col].values)
         
         return features_df
 
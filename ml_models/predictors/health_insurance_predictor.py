@@ -6,11 +6,15 @@ from ..models_loader import models_loader
 from ..validators import validator
 from ..utils import format_prediction_result
 from ..preprocessing import prepare_health_insurance_features
+from ..batching import batched_predict_with_proba
+from ..cache import prediction_cache
 
 
 class HealthInsurancePredictor:
-    def __init__(self):
-        self.model = models_loader.get_model('health_insurance')
+    @property
+    def model(self):
+        """Health insurance model, loaded by the registry on first use"""
+        return models_loader.get_model('health_insurance')
 
     def predict(self, input_data):
         # Optional: add a validator method, or skip validation for now
@@ -18,18 +22,18 @@ class HealthInsurancePredictor:
         # if errors:
         #     return {'error': ', '.join(errors)}
 
-        if self.model is None:
+        # One registry read: the whole request uses this version, even if a reload swaps it meanwhile
+        version = models_loader.get_version('health_insurance')
+        if version is None:
             return {'error': 'Health insurance prediction model is not available'}
 
         try:
             X = prepare_health_insurance_features(input_data)
-            pred = self.model.predict(X)[0]
-
-            proba = None
-            if hasattr(self.model, "predict_proba"):
-                proba = float(self.model.predict_proba(X)[0][1])
-
-            pred_int = int(pred)
+            # The feature row is the cache key; the model digest changes on reload
+            pred_int, proba = prediction_cache.get_or_compute(
+                'health_insurance', X.to_dict('records')[0], lambda: self._predict_row(X, version.model),
+                fingerprint=version.digest,
+            )
 
             label = "Has health insurance" if pred_int == 1 else "Don't have health insurance"
 
@@ -45,5 +49,18 @@ class HealthInsurancePredictor:
         except Exception as e:
             return {'error': f'Prediction failed: {str(e)}'}
 
+    def _predict_row(self, X, model=None):
+        """Model output for a one-row feature frame as (class, probability of Yes)"""
+        if model is None:
+            model = self.model
+        labels, probabilities = batched_predict_with_proba('health_insurance', lambda: model, X)
+        pred = labels[0]
+
+        proba = None
+        if probabilities is not None:
+            proba = float(probabilities[0][1])
+
+        return int(pred), proba
+
 
 health_insurance_predictor = HealthInsurancePredictor()
\ No newline at end of file
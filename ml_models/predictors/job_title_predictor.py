@@ -3,12 +3,27 @@ Job Title Prediction Module
 Predicts suitable job titles based on user skills and experience
 Uses job_classifier_model. pkl with feature engineering
 """
-import pickle
 import json
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from scipy.sparse import hstack, csr_matrix
+from ..artifacts import artifact_cache
+from ..classifiers import predict_with_proba
+
+
+# Engineered count features and the feature_engineering_config list each one counts
+# (None = the discriminative skills list). Order must match training!
+SKILL_CATEGORY_FEATURES = [
+    ('prog_skills', 'programming_skills'),
+    ('cloud_skills', 'cloud_skills'),
+    ('ml_skills', 'ml_tools'),
+    ('viz_skills', 'viz_tools'),
+    ('discriminative_skills_count', None),
+    ('big_data_count', 'big_data_skills'),
+    ('devops_count', 'devops_skills'),
+    ('deep_learning_count', 'deep_learning_skills'),
+]
 
 
 class JobTitlePredictor:  
@@ -21,6 +36,9 @@ class JobTitlePredictor:
         self. discriminative_skills = []
         self.feature_config = {}
         self.metadata = {}
+        # Normalized lookup tables, built once from the config files
+        self._skill_categories = {}
+        self._discriminative_normalized = frozenset()
         self._load_model()
         self._load_config_files()
     
@@ -35,15 +53,14 @@ class JobTitlePredictor:
             print(f"Model exists: {model_path.exists()}")
             
             if model_path.exists():
-                with open(model_path, 'rb') as f:
-                    artifacts = pickle.load(f)
-                    
-                    # Load all artifacts
-                    self.model = artifacts['model']
-                    self. vectorizer = artifacts['vectorizer']
-                    self.label_encoder = artifacts['label_encoder']
-                    self.discriminative_skills = artifacts. get('discriminative_skills', [])
-                    self.metadata = artifacts.get('model_metadata', {})
+                artifacts = artifact_cache.load(model_path, loaders=('pickle',))
+                
+                # Load all artifacts
+                self.model = artifacts['model']
+                self. vectorizer = artifacts['vectorizer']
+                self.label_encoder = artifacts['label_encoder']
+                self.discriminative_skills = artifacts. get('discriminative_skills', [])
+                self.metadata = artifacts.get('model_metadata', {})
                     
                 print("[OK] Job title classifier model loaded successfully")
                 print(f"   Model type: {type(self.model)}")
@@ -86,6 +103,27 @@ class JobTitlePredictor:
             
         except Exception as e:  
             print(f"[WARNING] Could not load config files: {e}")
+        
+        self._build_skill_tables()
+    
+    def _build_skill_tables(self):
+        """
+        Normalize the category skill lists once into a skill -> categories table
+        so feature engineering is a single dict lookup per user skill
+        """
+        categories = {}
+        for position, (_, config_key) in enumerate(SKILL_CATEGORY_FEATURES):
+            if config_key is None:
+                reference = self.discriminative_skills
+            else:
+                reference = self.feature_config.get(config_key, [])
+            for ref in frozenset(self._normalize_skill(ref) for ref in reference):
+                categories.setdefault(ref, []).append(position)
+        
+        self._skill_categories = {skill: tuple(positions) for skill, positions in categories.items()}
+        self._discriminative_normalized = frozenset(
+            self._normalize_skill(skill) for skill in self.discriminative_skills
+        )
     
     def _normalize_skill(self, skill):
         """Normalize skill name for matching"""
@@ -130,60 +168,19 @@ class JobTitlePredictor:
         Returns: 
             Dictionary of engineered features
         """
-        # Normalize skills to lowercase for matching
-        skills_lower = [self._normalize_skill(skill) for skill in skills_list]
-        
-        # Helper function to check if skill matches
-        def skill_in_list(skill, reference_list):
-            normalized_ref = [self._normalize_skill(ref) for ref in reference_list]
-            return any(skill == ref for ref in normalized_ref)
-        
         # Determine seniority from years of experience
         is_senior = self._determine_seniority_from_experience(years_of_experience)
         
-        # Count programming skills
-        prog_skills = sum(1 for skill in skills_lower 
-                         if skill_in_list(skill, self.feature_config. get('programming_skills', [])))
-        
-        # Count cloud skills
-        cloud_skills = sum(1 for skill in skills_lower 
-                          if skill_in_list(skill, self. feature_config.get('cloud_skills', [])))
-        
-        # Count ML tools
-        ml_skills = sum(1 for skill in skills_lower 
-                       if skill_in_list(skill, self.feature_config.get('ml_tools', [])))
-        
-        # Count visualization tools
-        viz_skills = sum(1 for skill in skills_lower 
-                        if skill_in_list(skill, self.feature_config.get('viz_tools', [])))
+        # Count skills per category: one table lookup per (normalized) skill
+        counts = [0] * len(SKILL_CATEGORY_FEATURES)
+        for skill in skills_list:
+            for position in self._skill_categories.get(self._normalize_skill(skill), ()):
+                counts[position] += 1
         
-        # Count discriminative skills
-        discriminative_skills_count = sum(1 for skill in skills_lower 
-                                         if skill_in_list(skill, self.discriminative_skills))
-        
-        # Count big data skills
-        big_data_count = sum(1 for skill in skills_lower 
-                            if skill_in_list(skill, self.feature_config.get('big_data_skills', [])))
-        
-        # Count DevOps skills
-        devops_count = sum(1 for skill in skills_lower 
-                          if skill_in_list(skill, self.feature_config.get('devops_skills', [])))
-        
-        # Count deep learning skills
-        deep_learning_count = sum(1 for skill in skills_lower 
-                                 if skill_in_list(skill, self.feature_config.get('deep_learning_skills', [])))
-        
-        return {
-            'is_senior': is_senior,
-            'prog_skills': prog_skills,
-            'cloud_skills': cloud_skills,
-            'ml_skills': ml_skills,
-            'viz_skills': viz_skills,
-            'discriminative_skills_count': discriminative_skills_count,
-            'big_data_count': big_data_count,
-            'devops_count': devops_count,
-            'deep_learning_count': deep_learning_count
-        }
+        features = {'is_senior': is_senior}
+        for (feature_name, _), count in zip(SKILL_CATEGORY_FEATURES, counts):
+            features[feature_name] = count
+        return features
     
     def _get_career_advice(self, job_title, features, years_of_experience):
         """Generate personalized career advice based on role and experience"""
@@ -265,7 +262,7 @@ class JobTitlePredictor:
         try:  
             # Normalize skills for matching with discriminative skills
             skills_normalized = [self._normalize_skill(skill) for skill in skills_list]
-            discriminative_normalized = [self._normalize_skill(skill) for skill in self.discriminative_skills]
+            discriminative_normalized = self._discriminative_normalized
             
             # Filter to only discriminative skills (like training)
             discriminative_used = []
@@ -304,14 +301,15 @@ class JobTitlePredictor:
             
             print(f"[OK] Final feature shape: {X_final.shape}")
             
-            # Make prediction
-            prediction_encoded = self.model.predict(X_final)[0]
+            # Make prediction (single model pass for label and probabilities)
+            labels, probabilities = predict_with_proba(self.model, X_final)
+            prediction_encoded = labels[0]
             prediction = self.label_encoder.inverse_transform([prediction_encoded])[0]
             
             print(f"🎯 Prediction: {prediction}")
             
             # Get probabilities
-            probabilities_array = self.model.predict_proba(X_final)[0]
+            probabilities_array = probabilities[0]
             confidence = max(probabilities_array)
             
             # Get top 3 predictions
@@ -14,19 +14,14 @@ FEATURES: Complete feature engineering pipeline (170+ columns)
 """
 import pandas as pd
 import numpy as np
-from pathlib import Path
+import threading
 import traceback
 from datetime import datetime
+from functools import lru_cache
 
-try:
-    import joblib
-except Exception:
-    joblib = None
-
-try:
-    import pickle
-except Exception:
-    pickle = None
+from ..models_loader import models_loader
+from ..cache import prediction_cache
+from ..backends import register_model, run_model
 
 # ============================================================================
 # COMPLETE FEATURE ENGINEERING PIPELINE (170+ COLUMNS)
@@ -58,23 +53,77 @@ AVAILABLE_SKILLS = [
 ]
 
 
+class SkillMatcher:
+    """
+    Precompiled matcher for the skill one-hot block
+    
+    A skill is present when it is a substring of any normalized user skill
+    (same rule as `any(skill in s for s in skills_list)`). Instead of scanning
+    every skill against every user skill, each user skill is cut into the
+    substrings whose lengths occur in the vocabulary and looked up in a dict;
+    the result per user skill is memoized, so repeated skills cost one lookup.
+    """
+    
+    def __init__(self, skills):
+        self.skills = list(skills)
+        self.columns = [f'skill_{skill}' for skill in self.skills]
+        self._index = {skill: idx for idx, skill in enumerate(self.skills)}
+        self._lengths = sorted({len(skill) for skill in self.skills})
+        self._match_token = lru_cache(maxsize=8192)(self._compute_token_matches)
+    
+    def _compute_token_matches(self, token):
+        """Column indices of every vocabulary skill contained in one user skill"""
+        matches = set()
+        token_len = len(token)
+        for length in self._lengths:
+            if length > token_len:
+                break
+            for start in range(token_len - length + 1):
+                idx = self._index.get(token[start:start + length])
+                if idx is not None:
+                    matches.add(idx)
+        return tuple(sorted(matches))
+    
+    @staticmethod
+    def _tokens(skills_text):
+        """Parse and normalize comma-separated skills"""
+        return [s.strip().lower().replace(' ', '_').replace('-', '_')
+                for s in skills_text.split(',') if s.strip()]
+    
+    def _fill(self, row, skills_text):
+        for token in self._tokens(skills_text):
+            matches = self._match_token(token)
+            if matches:
+                row[list(matches)] = 1
+    
+    def encode(self, skills_text):
+        """Skill indicator row (int64, one entry per AVAILABLE_SKILLS column)"""
+        row = np.zeros(len(self.skills), dtype=np.int64)
+        if skills_text:
+            self._fill(row, skills_text)
+        return row
+    
+    def encode_batch(self, skills_texts):
+        """Skill indicator matrix of shape (len(skills_texts), n_skills)"""
+        # Column-major so each skill column is contiguous when split into a DataFrame
+        matrix = np.zeros((len(skills_texts), len(self.skills)), dtype=np.int64, order='F')
+        for i, skills_text in enumerate(skills_texts):
+            if skills_text:
+                self._fill(matrix[i], skills_text)
+        return matrix
+
+
+# Built once at import
+SKILL_MATCHER = SkillMatcher(AVAILABLE_SKILLS)
+
+
 def extract_skills_from_text(skills_text):
     """Extract individual skills and create one-hot encoding"""
     if not skills_text:
         return {}
     
-    # Parse and normalize skills
-    skills_list = [s.strip().lower().replace(' ', '_').replace('-', '_') 
-                   for s in skills_text.split(',') if s.strip()]
-    
-    # Create one-hot encoding for ALL skills
-    skill_features = {}
-    for skill in AVAILABLE_SKILLS:
-        skill_col = f'skill_{skill}'
-        # Check if this skill matches any user skill
-        skill_features[skill_col] = 1 if any(skill in s for s in skills_list) else 0
-    
-    return skill_features
+    # One-hot encoding for ALL skills
+    return dict(zip(SKILL_MATCHER.columns, SKILL_MATCHER.encode(skills_text).tolist()))
 
 
 def classify_seniority(job_title):
@@ -135,6 +184,24 @@ def create_technology_features(skills_text):
     }
 
 
+def parse_remote_option(value):
+    """
+    remote_option as the 0/1 integer the model expects (missing or empty means 0)
+    Accepts 0/1 as numbers, booleans or strings (form and JSON inputs).
+    Raises:
+        ValueError for any other value
+    """
+    if value is None or value == '':
+        return 0
+    try:
+        remote = int(value.strip()) if isinstance(value, str) else int(value)
+    except (TypeError, ValueError):
+        remote = None
+    if remote not in (0, 1) or (not isinstance(value, str) and remote != value):
+        raise ValueError("Remote option must be 0 or 1")
+    return remote
+
+
 def prepare_complete_features(input_data):
     """
     MAIN: Convert minimal user input to 170+ required features
@@ -145,7 +212,7 @@ def prepare_complete_features(input_data):
     job_state = (input_data.get('job_state', '') or 'unknown').lower().strip()
     skills_text = (input_data.get('skills_text', '') or '').lower().strip()
     job_schedule = (input_data.get('job_schedule_type', '') or 'full_time').lower().strip()
-    remote_option = input_data.get('remote_option', 0)
+    remote_option = parse_remote_option(input_data.get('remote_option'))
     
     # Initialize feature dictionary
     all_features = {}
@@ -202,27 +269,156 @@ def prepare_complete_features(input_data):
     return df, all_features
 
 
-def _get_model():
-    """Load the salary regression model"""
-    model_path = Path(__file__).parent.parent / "models" / "salary_regression_model(zeineb+eya).pkl"
+def _int_columns(dict_rows):
+    """Turn a list of same-keyed dicts of ints into {key: int64 array}"""
+    n = len(dict_rows)
+    return {
+        key: np.fromiter((row[key] for row in dict_rows), dtype=np.int64, count=n)
+        for key in dict_rows[0]
+    }
+
+
+def prepare_complete_features_batch(records, now=None):
+    """
+    BATCH: Build the 170+ feature frame for many inputs at once
     
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model file not found: {model_path}")
+    Produces the same columns, order and dtypes as prepare_complete_features,
+    but assembles each column for all rows and creates a single DataFrame.
     
-    # Try joblib first (preferred for sklearn models)
-    if joblib is not None:
-        try:
-            return joblib.load(model_path)
-        except Exception as e:
-            print(f"joblib.load failed: {e}")
+    Args:
+        records: List of input dictionaries (same keys as predict_salary)
+        now: Optional datetime for the temporal features (defaults to now)
+    
+    Returns:
+        Tuple of (DataFrame with one row per record, n_skills int64 array)
+    """
+    n = len(records)
+    now = now or datetime.now()
+    
+    # Extract and normalize inputs
+    titles = [(r.get('job_title_short', '') or '').lower().strip() for r in records]
+    countries = [(r.get('job_country', '') or 'us').lower().strip() for r in records]
+    states = [(r.get('job_state', '') or 'unknown').lower().strip() for r in records]
+    skills_texts = [(r.get('skills_text', '') or '').lower().strip() for r in records]
+    schedules = [(r.get('job_schedule_type', '') or 'full_time').lower().strip() for r in records]
+    remote = np.fromiter(
+        (parse_remote_option(r.get('remote_option')) for r in records), dtype=np.int64, count=n
+    )
+    
+    zeros = np.zeros(n, dtype=np.int64)
+    ones = np.ones(n, dtype=np.int64)
+    columns = {}
+    
+    # ==================== Basic Features ====================
+    title_len = np.fromiter((len(t) for t in titles), dtype=np.int64, count=n)
+    columns['job_title_short'] = titles
+    columns['job_title_short_len'] = title_len
+    columns['job_title_len'] = title_len
+    columns['us_state'] = states
+    columns['job_country'] = countries
+    columns['job_schedule_type'] = schedules
+    columns['job_via'] = ['linkedin'] * n
+    columns['job_work_from_home'] = remote
+    columns['job_no_degree_mention'] = zeros
+    columns['job_health_insurance'] = ones
+    
+    # ==================== Skill Features (One-Hot) ====================
+    skill_matrix = SKILL_MATCHER.encode_batch(skills_texts)
+    for idx, skill_col in enumerate(SKILL_MATCHER.columns):
+        columns[skill_col] = skill_matrix[:, idx]
     
-    # Fallback to pickle
+    # ==================== Temporal Features ====================
+    columns['posted_month'] = np.full(n, now.month, dtype=np.int64)
+    columns['posted_year'] = np.full(n, now.year, dtype=np.int64)
+    columns['posted_dayofweek'] = np.full(n, now.weekday(), dtype=np.int64)
+    
+    # ==================== Seniority Features ====================
+    seniority = _int_columns([classify_seniority(t) for t in titles])
+    columns.update(seniority)
+    
+    # ==================== Technology Category Features ====================
+    tech = _int_columns([create_technology_features(t) for t in skills_texts])
+    columns.update(tech)
+    
+    # ==================== Skill Statistics ====================
+    n_skills = np.fromiter(
+        (sum(1 for s in t.split(',') if s.strip()) for t in skills_texts), dtype=np.int64, count=n
+    )
+    columns['n_skills'] = n_skills
+    columns['n_skill_groups'] = sum(tech.values())
+    columns['skill_value_mean'] = np.full(n, 0.5)
+    
+    # ==================== Company Features ====================
+    columns['company_name_reduced'] = ['other'] * n
+    columns['company_posting_log'] = np.full(n, np.log(10))
+    columns['role_family'] = ['data'] * n
+    
+    # ==================== Interaction Features ====================
+    columns['remote_x_senior'] = remote * seniority['is_senior']
+    is_ds = np.fromiter(('scientist' in t or 'analyst' in t for t in titles), dtype=np.int64, count=n)
+    columns['cloud_x_ds'] = tech['has_cloud'] * is_ds
+    
+    # ==================== Convert to DataFrame ====================
+    return pd.DataFrame(columns), n_skills
+
+
+# models_loader registry entry (the registry loads it on first use and reloads it when the file changes)
+MODEL_NAME = 'salary_regression'
+MODEL_PATH = models_loader.models_dir / models_loader.model_files[MODEL_NAME]
+MODEL_SPEC = register_model('salary', MODEL_PATH, ('joblib', 'pickle'))
+
+_WARMUP_LOCK = threading.Lock()
+_WARMUP_THREAD = None
+
+
+def _get_version():
+    """
+    Current registry version of the salary regression model
+    Read it once per request: model and digest then stay consistent across a reload.
+    """
+    version = models_loader.get_version(MODEL_NAME)
+    if version is None:
+        error = models_loader.get_model_stats(MODEL_NAME).get('error', 'not loaded')
+        raise FileNotFoundError(f"Could not load model: {MODEL_PATH} ({error})")
+    return version
+
+
+def _get_model():
+    """Return the current salary regression model, loading it on first use"""
+    return _get_version().model
+
+
+def _warm_up():
     try:
-        with open(model_path, 'rb') as f:
-            return pickle.load(f)
+        _get_version()
     except Exception as e:
-        print(f"pickle.load failed: {e}")
-        raise FileNotFoundError(f"Could not load model: {model_path}")
+        print(f"[WARNING] Salary model warm-up failed: {e}")
+
+
+def warm_up_model(background=True):
+    """
+    Load the salary model ahead of the first request
+    
+    Args:
+        background: Load in a daemon thread so process start is not blocked
+    
+    Returns:
+        The warm-up thread, or None when loading synchronously
+    """
+    global _WARMUP_THREAD
+    if not background:
+        _warm_up()
+        return None
+    
+    with _WARMUP_LOCK:
+        if models_loader.is_model_loaded(MODEL_NAME):
+            return None
+        if _WARMUP_THREAD is None or not _WARMUP_THREAD.is_alive():
+            _WARMUP_THREAD = threading.Thread(
+                target=_warm_up, name='salary-model-warmup', daemon=True
+            )
+            _WARMUP_THREAD.start()
+        return _WARMUP_THREAD
 
 
 def validate_salary_input(data):
@@ -238,6 +434,11 @@ def validate_salary_input(data):
     if not data.get('skills_text', '').strip():
         errors.append("Skills are required")
     
+    try:
+        parse_remote_option(data.get('remote_option'))
+    except ValueError as e:
+        errors.append(str(e))
+    
     return errors
 
 
@@ -258,6 +459,30 @@ def calculate_title_length(job_title_short):
     return len(job_title_short.strip()) if job_title_short else 0
 
 
+def _format_salary_result(data, log_salary_pred, num_skills, features_count):
+    """Convert a log-salary prediction into the result dictionary"""
+    # Convert log-salary back to actual salary
+    salary_pred = float(np.exp(log_salary_pred))
+    salary_pred = round(salary_pred, 0)
+    
+    # Safety bounds: $20k to $500k
+    if salary_pred < 20000:
+        salary_pred = 20000
+    elif salary_pred > 500000:
+        salary_pred = 500000
+    
+    return {
+        'success': True,
+        'prediction': f"${salary_pred:,.0f}",
+        'salary_value': salary_pred,
+        'log_salary': round(log_salary_pred, 4),
+        'currency': 'USD',
+        'job_title': data.get('job_title_short', ''),
+        'num_skills': num_skills,
+        'features_count': features_count,
+    }
+
+
 def predict_salary(data: dict) -> dict:
     """
     Predict salary using regression model
@@ -276,15 +501,50 @@ def predict_salary(data: dict) -> dict:
     Returns:
         Dictionary with prediction results including estimated salary
     """
+    try:
+        # Invalid inputs may normalize like valid ones (empty country -> 'us'), so never look them up
+        cacheable = not validate_salary_input(data)
+        features = _cache_features(data)
+        now = datetime.now()
+        # The version that answers, even if the file on disk was replaced since it loaded
+        version = _get_version()
+    except (AttributeError, TypeError, ValueError, OSError):
+        # Malformed input or missing model file: the uncached path reports the error
+        cacheable = False
+    if not cacheable:
+        return _predict_salary(data)
+    
+    result = prediction_cache.get_or_compute(
+        'salary', features, lambda: _predict_salary(data, version),
+        fingerprint=version.digest,
+        # posted_month / posted_year / posted_dayofweek are model inputs
+        time_bucket=[now.year, now.month, now.weekday()],
+        should_store=lambda result: result.get('success', False),
+    )
+    # Echo this request's title, not the one that populated the cache
+    return dict(result, job_title=data.get('job_title_short', ''))
+
+
+def _cache_features(data):
+    """Normalized inputs that fully determine the salary feature row (see prepare_complete_features)"""
+    return {
+        'job_title_short': (data.get('job_title_short', '') or '').lower().strip(),
+        'job_country': (data.get('job_country', '') or 'us').lower().strip(),
+        'job_state': (data.get('job_state', '') or 'unknown').lower().strip(),
+        'skills_text': (data.get('skills_text', '') or '').lower().strip(),
+        'job_schedule_type': (data.get('job_schedule_type', '') or 'full_time').lower().strip(),
+        'remote_option': parse_remote_option(data.get('remote_option')),
+    }
+
+
+def _predict_salary(data: dict, version=None) -> dict:
+    """Uncached salary prediction (see predict_salary) with the given registry version (default: current)"""
     try:
         # Validate input
         errors = validate_salary_input(data)
         if errors:
             return {'success': False, 'error': ', '.join(errors)}
         
-        # Load model
-        model = _get_model()
-        
         # ===== COMPLETE FEATURE ENGINEERING (170+ columns) =====
         X, features_dict = prepare_complete_features(data)
         
@@ -292,31 +552,15 @@ def predict_salary(data: dict) -> dict:
         print(f"   Skill columns: {sum(1 for k in features_dict if k.startswith('skill_'))}")
         print(f"   DataFrame shape: {X.shape}")
         
-        # Make prediction (model predicts log-salary)
-        log_salary_pred = float(model.predict(X)[0])
-        
-        # Convert log-salary back to actual salary
-        salary_pred = float(np.exp(log_salary_pred))
-        salary_pred = round(salary_pred, 0)
-        
-        # Safety bounds: $20k to $500k
-        if salary_pred < 20000:
-            salary_pred = 20000
-        elif salary_pred > 500000:
-            salary_pred = 500000
+        # Make prediction (model predicts log-salary) in process or on an inference worker
+        version = version or _get_version()
+        log_salary_pred = float(
+            run_model(MODEL_SPEC, 'predict', X, lambda: version.model, digest=version.digest)[0]
+        )
         
-        num_skills = features_dict.get('n_skills', 0)
-        
-        return {
-            'success': True,
-            'prediction': f"${salary_pred:,.0f}",
-            'salary_value': salary_pred,
-            'log_salary': round(log_salary_pred, 4),
-            'currency': 'USD',
-            'job_title': data.get('job_title_short', ''),
-            'num_skills': num_skills,
-            'features_count': len(features_dict),
-        }
+        return _format_salary_result(
+            data, log_salary_pred, features_dict.get('n_skills', 0), len(features_dict)
+        )
     
     except FileNotFoundError as e:
         return {'success': False, 'error': f'Model file not found: {str(e)}'}
@@ -327,12 +571,72 @@ def predict_salary(data: dict) -> dict:
         return {'success': False, 'error': f'Prediction failed: {str(e)}'}
 
 
+def predict_salary_batch(records: list) -> list:
+    """
+    Predict salaries for many inputs with a single model call
+    
+    Features for all valid rows are built as one columnar DataFrame and scored
+    with one model.predict call, so cost grows with rows rather than calls.
+    
+    Args:
+        records: List of input dictionaries (same keys as predict_salary)
+    
+    Returns:
+        List of result dictionaries aligned with records; rows that fail
+        validation get {'success': False, 'error': ...} like predict_salary
+    """
+    results = [None] * len(records)
+    valid = []
+    
+    # Validate each row independently
+    for i, data in enumerate(records):
+        try:
+            errors = validate_salary_input(data)
+        except (AttributeError, TypeError) as e:
+            errors = [f'Invalid input: {str(e)}']
+        if errors:
+            results[i] = {'success': False, 'error': ', '.join(errors)}
+        else:
+            valid.append(i)
+    
+    if not valid:
+        return results
+    
+    try:
+        # One registry read: the whole batch uses this version, even if a reload swaps it meanwhile
+        version = _get_version()
+        X, n_skills = prepare_complete_features_batch([records[i] for i in valid])
+        # In process, or on an inference worker when the process backend is configured
+        log_salary_preds = run_model(MODEL_SPEC, 'predict', X, lambda: version.model, digest=version.digest)
+        
+        for row, i in enumerate(valid):
+            results[i] = _format_salary_result(
+                records[i], float(log_salary_preds[row]), int(n_skills[row]), X.shape[1]
+            )
+    
+    except FileNotFoundError as e:
+        error = {'success': False, 'error': f'Model file not found: {str(e)}'}
+        for i in valid:
+            results[i] = dict(error)
+    except Exception as e:
+        print(f"Salary batch prediction error: {traceback.format_exc()}")
+        error = {'success': False, 'error': f'Prediction failed: {str(e)}'}
+        for i in valid:
+            results[i] = dict(error)
+    
+    return results
+
+
 class SalaryPredictor:
     """Salary prediction handler - compatible interface"""
     
     def predict(self, data: dict) -> dict:
         """Make prediction using predict_salary function"""
         return predict_salary(data)
+    
+    def predict_batch(self, records: list) -> list:
+        """Make predictions using predict_salary_batch function"""
+        return predict_salary_batch(records)
 
 
 # Global predictor instance for consistency with other predictors
@@ -2,82 +2,83 @@
 XGBoost Company Growth Predictor
 Predicts company growth using XGBoost model with dynamic feature encoding
 """
-import pickle
 import numpy as np
-from pathlib import Path
+from ..models_loader import models_loader
+from ..compiled_trees import compile_if_enabled
+
+# Industries used in training
+INDUSTRIES = [
+    'Advertising & Marketing',
+    'Business Products & Services',
+    'Computer Hardware',
+    'Construction',
+    'Consumer Products & Services',
+    'Education',
+    'Energy',
+    'Engineering',
+    'Environmental Services',
+    'Financial Services',
+    'Food & Beverage',
+    'Government Services',
+    'Health',
+    'Human Resources',
+    'Insurance',
+    'IT Management',
+    'IT Services',
+    'IT System Development',
+    'Logistics & Transportation',
+    'Manufacturing',
+    'Media',
+    'Real Estate',
+    'Retail',
+    'Security',
+    'Software',
+    'Telecommunications',
+    'Travel & Hospitality'
+]
+
+
+def _feature_layout(features):
+    """Column positions and state options of one version of model_features.pkl"""
+    return {
+        'index': {name: idx for idx, name in enumerate(features)},
+        'n_features': len(features),
+        'states': [f.replace('State_', '') for f in features if f.startswith('State_')],
+    }
 
 
 class XGBoostGrowthPredictor:
     """Predicts company growth using XGBoost model"""
     
     def __init__(self):
-        """Load the XGBoost model and feature list"""
-        self.model = None
-        self.features = None
-        self.industries = []
-        self.states = []
-        self._load_model()
+        """Register the per-version objects; the registry loads the model and feature list on first use"""
+        self.industries = list(INDUSTRIES)
+        models_loader.add_preparer(
+            'xgboost_growth', 'compiled', lambda model: compile_if_enabled(model, 'xgboost_growth')
+        )
+        models_loader.add_preparer('model_features', 'layout', _feature_layout)
     
-    def _load_model(self):
-        """Load the XGBoost model and feature list"""
-        try:
-            models_dir = Path(__file__).parent.parent / 'models'
-            model_path = models_dir / 'xgboost_growth_model.pkl'
-            features_path = models_dir / 'model_features.pkl'
-            
-            # Define the exact industries used in training
-            self.industries = [
-                'Advertising & Marketing',
-                'Business Products & Services',
-                'Computer Hardware',
-                'Construction',
-                'Consumer Products & Services',
-                'Education',
-                'Energy',
-                'Engineering',
-                'Environmental Services',
-                'Financial Services',
-                'Food & Beverage',
-                'Government Services',
-                'Health',
-                'Human Resources',
-                'Insurance',
-                'IT Management',
-                'IT Services',
-                'IT System Development',
-                'Logistics & Transportation',
-                'Manufacturing',
-                'Media',
-                'Real Estate',
-                'Retail',
-                'Security',
-                'Software',
-                'Telecommunications',
-                'Travel & Hospitality'
-            ]
-            
-            if model_path.exists() and features_path.exists():
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                
-                with open(features_path, 'rb') as f:
-                    self.features = pickle.load(f)
-                
-                print(f"[OK] XGBoost growth model loaded with {len(self.features)} features")
-                # Extract state options from feature names
-                self.states = [f.replace('State_', '') for f in self.features if f.startswith('State_')]
-                print(f"  - Industries: {len(self.industries)} options")
-                print(f"  - States: {len(self.states)} options")
-            else:
-                print(f"✗ XGBoost growth model files not found at {models_dir}")
-                if not model_path.exists():
-                    print(f"  Missing: {model_path}")
-                if not features_path.exists():
-                    print(f"  Missing: {features_path}")
-        except Exception as e:
-            print(f"✗ Error loading XGBoost growth model: {e}")
-            import traceback
-            traceback.print_exc()
+    @property
+    def model(self):
+        """XGBoost growth model, loaded by the registry on first use"""
+        return models_loader.get_model('xgboost_growth')
+    
+    @property
+    def features(self):
+        """Feature names of the current model_features.pkl"""
+        return models_loader.get_model('model_features')
+    
+    @property
+    def states(self):
+        """State options of the current feature list"""
+        layout = self._get_layout()
+        return layout['states'] if layout is not None else []
+    
+    def _get_layout(self):
+        version = models_loader.get_version('model_features')
+        if version is None:
+            return None
+        return models_loader.prepared('model_features', version, 'layout')
     
     def predict(self, input_data):
         """
@@ -92,89 +93,114 @@ class XGBoostGrowthPredictor:
         Returns:
             Dictionary with prediction results
         """
-        # Check if model is loaded
-        if self.model is None or self.features is None:
-            return {
+        return self.predict_batch([input_data])[0]
+    
+    def _construct_feature_matrix(self, layout, years_on_list, company_age, hiring_growth, industries, states):
+        """
+        Build an N x F float32 input matrix from per-column lists of inputs
+        Only the set features are written, through the name -> index map of the feature layout.
+        """
+        index = layout['index']
+        matrix = np.zeros((len(years_on_list), layout['n_features']), dtype=np.float32)
+        
+        # Numeric features
+        for name, values in (('YearsOnList', years_on_list),
+                             ('CompanyAge', company_age),
+                             ('HiringGrowth', hiring_growth)):
+            idx = index.get(name)
+            if idx is not None:
+                matrix[:, idx] = values
+        
+        # One-hot encode industry and state
+        for row, (industry, state) in enumerate(zip(industries, states)):
+            idx = index.get(f'industry_{industry}')
+            if idx is not None:
+                matrix[row, idx] = 1
+            idx = index.get(f'State_{state}')
+            if idx is not None:
+                matrix[row, idx] = 1
+        
+        return matrix
+    
+    def predict_batch(self, records):
+        """
+        Predict company growth for many companies with a single model call
+        Args:
+            records: List of input dictionaries (same keys as predict)
+        Returns:
+            List of result dictionaries aligned with records
+        """
+        # One registry read per file: the whole batch uses these versions, even if a reload swaps them meanwhile
+        model_version = models_loader.get_version('xgboost_growth')
+        features_version = models_loader.get_version('model_features')
+        if model_version is None or features_version is None:
+            return [{
                 'success': False,
                 'error': 'XGBoost growth prediction model is not available'
-            }
+            } for _ in records]
         
-        try:
-            # Validate and extract inputs
-            years_on_list = float(input_data.get('years_on_list', 0))
-            company_age = float(input_data.get('company_age', 0))
-            hiring_growth = float(input_data.get('hiring_growth', 0))
-            industry = input_data.get('industry', '')
-            state = input_data.get('state', '')
+        results = [None] * len(records)
+        valid = []
+        columns = ([], [], [], [], [])
+        
+        for i, input_data in enumerate(records):
+            try:
+                row = (
+                    float(input_data.get('years_on_list', 0)),
+                    float(input_data.get('company_age', 0)),
+                    float(input_data.get('hiring_growth', 0)),
+                    input_data.get('industry', ''),
+                    input_data.get('state', ''),
+                )
+            except (ValueError, TypeError) as e:
+                results[i] = {'success': False, 'error': f'Prediction failed: {str(e)}'}
+                continue
             
-            # Validate inputs
-            if years_on_list < 0 or company_age < 0:
-                return {
+            if row[0] < 0 or row[1] < 0:
+                results[i] = {
                     'success': False,
                     'error': 'Years on list and company age must be non-negative'
                 }
-            
-            if not industry or not state:
-                return {
+            elif not row[3] or not row[4]:
+                results[i] = {
                     'success': False,
                     'error': 'Industry and state are required'
                 }
-            
-            # Construct feature vector dynamically
-            feature_vector = self._construct_feature_vector(
-                years_on_list, company_age, hiring_growth, industry, state
-            )
-            
-            # Make prediction - classification model outputs class label
-            prediction = self.model.predict(feature_vector)[0]
-            
-            # The model outputs a class label (likely 0 or 1, or category name)
-            # Interpret the prediction
-            growth_category = self._interpret_prediction(prediction)
-            
-            return {
-                'success': True,
-                'growth_category': growth_category,
-                'raw_prediction': str(prediction),
-                'input_summary': {
-                    'years_on_list': years_on_list,
-                    'company_age': company_age,
-                    'hiring_growth': hiring_growth,
-                    'industry': industry,
-                    'state': state
-                }
-            }
+            else:
+                valid.append(i)
+                for column, value in zip(columns, row):
+                    column.append(value)
         
+        if not valid:
+            return results
+        
+        try:
+            model = models_loader.prepared('xgboost_growth', model_version, 'compiled')
+            layout = models_loader.prepared('model_features', features_version, 'layout')
+            predictions = model.predict(self._construct_feature_matrix(layout, *columns))
         except Exception as e:
             import traceback
             traceback.print_exc()
-            return {
-                'success': False,
-                'error': f'Prediction failed: {str(e)}'
-            }
-    
-    def _construct_feature_vector(self, years_on_list, company_age, hiring_growth, industry, state):
-        """
-        Dynamically construct feature vector matching the model's expected input
-        """
-        # Initialize feature vector with zeros
-        feature_vector = np.zeros(len(self.features))
+            for i in valid:
+                results[i] = {'success': False, 'error': f'Prediction failed: {str(e)}'}
+            return results
         
-        # Map features by name
-        for idx, feature_name in enumerate(self.features):
-            if feature_name == 'YearsOnList':
-                feature_vector[idx] = years_on_list
-            elif feature_name == 'CompanyAge':
-                feature_vector[idx] = company_age
-            elif feature_name == 'HiringGrowth':
-                feature_vector[idx] = hiring_growth
-            elif feature_name == f'industry_{industry}':
-                feature_vector[idx] = 1  # One-hot encode industry
-            elif feature_name == f'State_{state}':
-                feature_vector[idx] = 1  # One-hot encode state
+        for row, i in enumerate(valid):
+            prediction = predictions[row]
+            results[i] = {
+                'success': True,
+                'growth_category': self._interpret_prediction(prediction),
+                'raw_prediction': str(prediction),
+                'input_summary': {
+                    'years_on_list': columns[0][row],
+                    'company_age': columns[1][row],
+                    'hiring_growth': columns[2][row],
+                    'industry': columns[3][row],
+                    'state': columns[4][row]
+                }
+            }
         
-        # Reshape for model input (1 sample, n features)
-        return feature_vector.reshape(1, -1)
+        return results
     
     def _interpret_prediction(self, prediction):
         """
@@ -202,8 +228,9 @@ class XGBoostGrowthPredictor:
     
     def get_state_choices(self):
         """Get list of valid state choices"""
-        if self.states:
-            return [(state, state) for state in sorted(self.states)]
+        states = self.states
+        if states:
+            return [(state, state) for state in sorted(states)]
         return []
 
 
@@ -0,0 +1,65 @@
+"""
+Model Preloading
+Load every model artifact and predictor singleton before gunicorn forks its workers.
+"""
+import gc
+import importlib
+import time
+
+from .models_loader import models_loader
+
+# Modules whose import creates a predictor singleton
+PREDICTOR_MODULES = [
+    'ml_models.predictors.job_title_predictor',
+    'ml_models.predictors.degree_predictor',
+    'ml_models.predictors.degree_mention_predictor',
+    'ml_models.predictors.company_growth_predictor',
+    'ml_models.predictors.xgboost_growth_predictor',
+    'ml_models.predictors.campaign_conversion_predictor',
+    'ml_models.predictors.health_insurance_predictor',
+    'ml_models.predictors.remote_work_predictor',
+    'ml_models.predictors.salary_predictor_regression',
+]
+
+
+def preload_models(freeze=True):
+    """
+    Load all registered models and predictor singletons into this process
+
+    Meant to run in the gunicorn master (see gunicorn.conf.py). With freeze=True the
+    loaded objects are moved to the GC's permanent generation so collections in the
+    forked workers never write to their pages, keeping them shared copy-on-write.
+
+    Args:
+        freeze: Run gc.collect() then gc.freeze() once everything is loaded
+
+    Returns:
+        Dictionary of load time in seconds per registry entry and predictor module
+    """
+    timings = {}
+    # The reload watcher runs in the forked workers, not in the master
+    models_loader.defer_watching()
+
+    for model_name in models_loader.model_files:
+        start = time.perf_counter()
+        models_loader.get_model(model_name)
+        timings[model_name] = round(time.perf_counter() - start, 4)
+
+    for module_name in PREDICTOR_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"[WARNING] Could not preload {module_name}: {e}")
+            continue
+        timings[module_name] = round(time.perf_counter() - start, 4)
+
+    # Compiled evaluators, feature layouts and code tables of the loaded versions
+    models_loader.prepare_loaded()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+        print(f"[OK] Preloaded models and froze {gc.get_freeze_count()} objects")
+
+    return timings
@@ -0,0 +1,171 @@
+"""
+Feature Frame Transport
+Hand feature DataFrames to another process through shared memory instead of pickling them
+"""
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Keep every column block 64-byte aligned inside the segment
+_ALIGN = 64
+
+# dtype of the integer codes that replace categorical / object columns
+CODE_DTYPE = np.dtype('<i4')
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _encode_column(series):
+    """
+    Split a column into (values array, categorical info or None)
+    Numeric and bool columns are sent as-is; object and category columns become
+    int32 codes plus their vocabulary (missing values get code -1).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy().astype(CODE_DTYPE)
+        return codes, {'kind': 'category', 'vocab': series.cat.categories.tolist(),
+                       'ordered': bool(series.cat.ordered)}
+
+    values = series.to_numpy()
+    if values.dtype.kind in 'biuf':
+        return values, None
+
+    codes, uniques = pd.factorize(values)
+    missing = values[codes == -1]
+    return codes.astype(CODE_DTYPE), {
+        'kind': 'object',
+        'vocab': uniques.tolist(),
+        # Missing entries come back as the first missing value seen (None or NaN)
+        'missing': missing[0] if len(missing) else None,
+    }
+
+
+def _decode_column(values, info):
+    if info is None:
+        return values.copy()
+    if info['kind'] == 'category':
+        return pd.Categorical.from_codes(values.copy(), categories=info['vocab'], ordered=info['ordered'])
+    # Code -1 indexes the trailing missing value
+    vocab = info['vocab']
+    lookup = np.fromiter(
+        (*vocab, info['missing']), dtype=object, count=len(vocab) + 1
+    )
+    return lookup[values]
+
+
+class SharedFrame:
+    """
+    Sender side: writes a DataFrame into one shared memory segment and describes
+    it with a small picklable dict
+
+    Columns are grouped by (encoded) dtype and written column-major, each column
+    contiguous. Object and category columns travel as int32 codes; only their
+    vocabularies ride in the descriptor. Use as a context manager; the segment is
+    unlinked on exit, so the receiver must be done with it by then.
+    """
+
+    def __init__(self, df):
+        # Numeric columns of one dtype are taken as one 2D block; encoded columns one by one
+        grouped = {}
+        categorical = {}
+        numeric = {}
+        for position, (col, dtype) in enumerate(df.dtypes.items()):
+            if not isinstance(dtype, pd.CategoricalDtype) and dtype.kind in 'biuf':
+                numeric.setdefault(dtype.str, []).append((position, col))
+                continue
+            values, info = _encode_column(df.iloc[:, position])
+            grouped.setdefault(values.dtype.str, []).append((col, values))
+            categorical[col] = info
+
+        # (dtype, column names, rows x columns array, offset)
+        layout = []
+        size = 0
+        for dtype, columns in numeric.items():
+            # Positional selection avoids a label lookup per column
+            values = df.iloc[:, [position for position, _ in columns]].to_numpy(dtype=dtype)
+            layout.append((dtype, [col for _, col in columns], values, size))
+            size = _aligned(size + len(df) * np.dtype(dtype).itemsize * len(columns))
+        for dtype, columns in grouped.items():
+            block = np.column_stack([values for _, values in columns]) if len(df) else None
+            layout.append((dtype, [col for col, _ in columns], block, size))
+            size = _aligned(size + len(df) * np.dtype(dtype).itemsize * len(columns))
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        blocks = []
+        for dtype, columns, values, offset in layout:
+            if len(df):
+                block = np.ndarray((len(columns), len(df)), dtype=dtype, buffer=self.shm.buf, offset=offset)
+                block[...] = values.T
+                del block
+            blocks.append({'dtype': dtype, 'columns': columns, 'offset': offset})
+
+        self.descriptor = {
+            'shm': self.shm.name,
+            'rows': len(df),
+            'columns': list(df.columns),
+            'blocks': blocks,
+            'categorical': categorical,
+        }
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self.descriptor
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def send_frame(df):
+    """Share a DataFrame; use as `with send_frame(df) as descriptor: ...`"""
+    return SharedFrame(df)
+
+
+def decode_frame(descriptor, buf):
+    """
+    Rebuild the DataFrame (original column order and dtypes) from a descriptor and the
+    segment's buffer. Each numeric block is copied out once, so the segment can be
+    closed as soon as the frame is built.
+    """
+    rows = descriptor['rows']
+    categorical = descriptor['categorical']
+    parts = []
+    for block in descriptor['blocks']:
+        columns = block['columns']
+        values = np.ndarray((len(columns), rows), dtype=block['dtype'], buffer=buf, offset=block['offset'])
+        if columns[0] in categorical:
+            parts.append(pd.DataFrame(
+                {col: _decode_column(values[i], categorical[col]) for i, col in enumerate(columns)},
+                index=pd.RangeIndex(rows),
+            ))
+        else:
+            # (columns, rows) C-order copy transposed: pandas keeps it as one block without another copy
+            parts.append(pd.DataFrame(values.copy().T, columns=columns, index=pd.RangeIndex(rows)))
+        del values
+
+    if not parts:
+        return pd.DataFrame(index=pd.RangeIndex(rows), columns=descriptor['columns'])
+    frame = parts[0] if len(parts) == 1 else pd.concat(parts, axis=1, copy=False)
+    columns = descriptor['columns']
+    if list(frame.columns) != columns:
+        frame = frame[columns]
+    return frame
+
+
+@contextmanager
+def receive_frame(descriptor):
+    """Receiver side: attach to the segment, yield the DataFrame, then detach"""
+    shm = shared_memory.SharedMemory(name=descriptor['shm'])
+    try:
+        frame = decode_frame(descriptor, shm.buf)
+    finally:
+        shm.close()
+    yield frame
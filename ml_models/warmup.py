@@ -0,0 +1,185 @@
+"""
+Predictor Warm-up
+Send one canned input through every predictor so the first real request does not pay lazy start-up costs
+"""
+import threading
+import time
+
+# Representative inputs, with values taken from the prediction forms
+SALARY_INPUT = {
+    'job_title_short': 'Data Scientist',
+    'job_country': 'United States',
+    'skills_text': 'python, sql, aws, spark',
+    'remote_option': 1,
+}
+
+REMOTE_WORK_INPUT = {
+    'job_title_short': 'Data Engineer',
+    'job_seniority': 'Senior',
+    'job_country': 'United States',
+    'job_schedule_type': 'Full-time',
+    'text_block': 'Build data pipelines with Python, SQL and Airflow. Hybrid team, remote days available.',
+}
+
+DEGREE_MENTION_INPUT = {
+    'skill_count': 5,
+    'job_title_short': 'Data Analyst',
+    'job_via': 'via LinkedIn',
+    'company_name': 'Unknown',
+    'job_country': 'United States',
+    'search_location': 'United States',
+}
+
+CAMPAIGN_INPUT = {
+    'company': 'TechCorp',
+    'campaign_type': 'Email',
+    'target_audience': 'Women 25-34',
+    'duration': 30,
+    'channel_used': 'Google Ads',
+    'location': 'New York',
+    'language': 'English',
+    'customer_segment': 'Tech Enthusiasts',
+}
+
+HEALTH_INSURANCE_INPUT = {
+    'job_title_short': 'Data Analyst',
+    'company_name': 'Unknown',
+    'job_schedule_type': 'full-time',
+    'job_work_from_home': 'No',
+    'job_country': 'USA',
+}
+
+COMPANY_GROWTH_INPUT = {
+    'workers': 120,
+    'previous_workers': 100,
+    'revenue': 15000000,
+    'founded': 2010,
+    'industry': 'Software',
+}
+
+XGBOOST_GROWTH_INPUT = {
+    'years_on_list': 3,
+    'company_age': 12,
+    'hiring_growth': 0.15,
+    'industry': 'Software',
+    'state': 'CA',
+}
+
+
+# Each call goes around the prediction cache (batch entry points, or the model step
+# for health insurance): a warm-up answer must not be cached and, with a shared cache
+# backend, a worker must not skip its own warm-up on another worker's entry.
+
+def _job_title():
+    from .predictors.job_title_predictor import job_title_predictor
+    return job_title_predictor.predict(['Python', 'SQL', 'Tableau', 'Machine Learning'], 3)
+
+
+def _degree_mention():
+    from .predictors.degree_mention_predictor import degree_mention_predictor
+    return degree_mention_predictor.predict(DEGREE_MENTION_INPUT)
+
+
+def _campaign_conversion():
+    from .predictors.campaign_conversion_predictor import campaign_conversion_predictor
+    return campaign_conversion_predictor.predict(CAMPAIGN_INPUT)
+
+
+def _health_insurance():
+    from .preprocessing import prepare_health_insurance_features
+    from .predictors.health_insurance_predictor import health_insurance_predictor
+    if health_insurance_predictor.model is None:
+        return {'error': 'Health insurance prediction model is not available'}
+    return health_insurance_predictor._predict_row(prepare_health_insurance_features(HEALTH_INSURANCE_INPUT))
+
+
+def _remote_work():
+    from .predictors.remote_work_predictor import predict_remote_work_batch
+    return predict_remote_work_batch([REMOTE_WORK_INPUT])[0]
+
+
+def _salary():
+    from .predictors.salary_predictor_regression import predict_salary_batch
+    return predict_salary_batch([SALARY_INPUT])[0]
+
+
+def _company_growth():
+    from .predictors.company_growth_predictor import company_growth_predictor
+    return company_growth_predictor.predict(COMPANY_GROWTH_INPUT)
+
+
+def _xgboost_growth():
+    from .predictors.xgboost_growth_predictor import xgboost_growth_predictor
+    return xgboost_growth_predictor.predict(XGBOOST_GROWTH_INPUT)
+
+
+WARMUP_CALLS = {
+    'job_title': _job_title,
+    'degree_mention': _degree_mention,
+    'campaign_conversion': _campaign_conversion,
+    'health_insurance': _health_insurance,
+    'remote_work': _remote_work,
+    'salary': _salary,
+    'company_growth': _company_growth,
+    'xgboost_growth': _xgboost_growth,
+}
+
+# Results of the last warm-up in this process
+_LAST_WARMUP = {}
+_WARMUP_LOCK = threading.Lock()
+
+
+def _failure(result):
+    """Error message of a predictor result dictionary, or None when it succeeded"""
+    if isinstance(result, dict) and (result.get('success') is False or 'error' in result):
+        return str(result.get('error', 'prediction failed'))
+    return None
+
+
+def warm_up_predictors(names=None):
+    """
+    Run each predictor once on its canned input
+
+    Loads the models, then pays the first-call costs: XGBoost / OpenMP thread pools,
+    scikit-learn input validation, pandas dtype inference and the micro-batcher
+    thread. Run it in every worker after the fork (see gunicorn.conf.py), not in
+    the gunicorn master: thread pools do not survive fork.
+
+    Args:
+        names: Subset of WARMUP_CALLS to run (all by default)
+
+    Returns:
+        Dictionary of {'seconds': float, 'ok': bool} (plus 'error' on failure) per predictor
+    """
+    timings = {}
+    with _WARMUP_LOCK:
+        for name in names or WARMUP_CALLS:
+            start = time.perf_counter()
+            try:
+                error = _failure(WARMUP_CALLS[name]())
+            except Exception as e:
+                error = str(e)
+            entry = {'seconds': round(time.perf_counter() - start, 4), 'ok': error is None}
+            if error is None:
+                print(f"[OK] Warmed up {name} in {entry['seconds']:.3f}s")
+            else:
+                entry['error'] = error
+                print(f"[WARNING] Warm-up of {name} failed after {entry['seconds']:.3f}s: {error}")
+            timings[name] = entry
+        _LAST_WARMUP.update(timings)
+    return timings
+
+
+def warm_up_in_background(names=None):
+    """Start warm_up_predictors in a daemon thread; returns the thread"""
+    thread = threading.Thread(
+        target=warm_up_predictors, args=(names,), name='predictor-warmup', daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def warmup_timings():
+    """Per-predictor results of the warm-ups run in this process so far"""
+    with _WARMUP_LOCK:
+        return {name: dict(entry) for name, entry in _LAST_WARMUP.items()}
@@ -0,0 +1,4 @@
+"""
+Predictions JSON API
+Programmatic access to the predictor singletons without template rendering
+"""
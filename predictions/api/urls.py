@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('', views.api_index, name='index'),
+    path('metrics/', views.api_metrics, name='metrics'),
+    path('batch/<slug:name>/', views.predict_batch, name='predict_batch'),
+    path('<slug:name>/', views.predict, name='predict'),
+]
@@ -0,0 +1,303 @@
+"""
+Predictions JSON API Views
+One POST route per predictor plus a batch route, all answering with compact JSON.
+
+Service clients send the shared token (settings.ML_API_TOKEN) as 'Authorization:
+Bearer <token>'; those calls never touch request.user or request.session, so no
+session row is read per call. Without the token a route applies the same login and
+role checks as the predictor's HTML page (with the CSRF check for logged-in
+sessions) and accepts smaller batches.
+Requests may send a JSON body or a form-encoded body.
+"""
+import hmac
+import json
+import os
+import sys
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+# Largest number of inputs accepted by the batch route from clients with the API token
+MAX_BATCH_SIZE = 10000
+# Largest batch accepted without the token (browser sessions and anonymous callers)
+MAX_PUBLIC_BATCH_SIZE = 100
+
+# Who may call a route without the API token, matching the predictor's HTML view
+PUBLIC = 'public'
+LOGIN = 'login'
+JOB_SEEKER = 'job_seeker'
+STAFF = 'staff'
+
+
+class PredictionJSONEncoder(DjangoJSONEncoder):
+    """JSON encoder that also accepts NumPy scalars and arrays returned by predictors"""
+
+    def default(self, o):
+        # NumPy is only imported by the predictors; until then no value can be a NumPy type
+        np = sys.modules.get('numpy')
+        if np is None:
+            return super().default(o)
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return super().default(o)
+
+
+def _json(data, status=200):
+    return JsonResponse(
+        data, status=status, encoder=PredictionJSONEncoder,
+        json_dumps_params={'separators': (',', ':')},
+    )
+
+
+def _error(message, status):
+    return _json({'success': False, 'error': message}, status=status)
+
+
+# ==================== Predictor adapters ====================
+# Predictors are imported on first call so the API module stays cheap to import.
+
+def _salary(data):
+    from ml_models.predictors.salary_predictor_regression import predict_salary
+    return predict_salary(data)
+
+
+def _salary_batch(records):
+    from ml_models.predictors.salary_predictor_regression import predict_salary_batch
+    return predict_salary_batch(records)
+
+
+def _remote_work(data):
+    from ml_models.predictors.remote_work_predictor import predict_remote_work
+    return predict_remote_work(data)
+
+
+def _remote_work_batch(records):
+    from ml_models.predictors.remote_work_predictor import predict_remote_work_batch
+    return predict_remote_work_batch(records)
+
+
+def _health_insurance(data):
+    from ml_models.predictors.health_insurance_predictor import health_insurance_predictor
+    return health_insurance_predictor.predict(data)
+
+
+def _campaign_conversion(data):
+    from ml_models.predictors.campaign_conversion_predictor import campaign_conversion_predictor
+    return campaign_conversion_predictor.predict(data)
+
+
+def _degree_mention(data):
+    from ml_models.predictors.degree_mention_predictor import degree_mention_predictor
+    return degree_mention_predictor.predict(data)
+
+
+def _job_title(data):
+    from ml_models.predictors.job_title_predictor import job_title_predictor
+    skills = data.get('skills') or []
+    if isinstance(skills, str):
+        skills = [s.strip() for s in skills.split(',') if s.strip()]
+    return job_title_predictor.predict(skills, years_of_experience=data.get('years_of_experience'))
+
+
+def _company_growth(data):
+    from ml_models.predictors.company_growth_predictor import company_growth_predictor
+    return company_growth_predictor.predict(data)
+
+
+def _company_growth_batch(records):
+    from ml_models.predictors.company_growth_predictor import company_growth_predictor
+    return company_growth_predictor.predict_batch(records)
+
+
+def _xgboost_growth(data):
+    from ml_models.predictors.xgboost_growth_predictor import xgboost_growth_predictor
+    return xgboost_growth_predictor.predict(data)
+
+
+def _xgboost_growth_batch(records):
+    from ml_models.predictors.xgboost_growth_predictor import xgboost_growth_predictor
+    return xgboost_growth_predictor.predict_batch(records)
+
+
+# Route name -> (single predict, batch predict or None to loop over single, access without the token)
+PREDICTORS = {
+    'salary': (_salary, _salary_batch, LOGIN),
+    'remote-work': (_remote_work, _remote_work_batch, PUBLIC),
+    'health-insurance': (_health_insurance, None, JOB_SEEKER),
+    'campaign-conversion': (_campaign_conversion, None, LOGIN),
+    'degree-mention': (_degree_mention, None, PUBLIC),
+    'job-title': (_job_title, None, LOGIN),
+    'company-growth': (_company_growth, _company_growth_batch, PUBLIC),
+    'xgboost-growth': (_xgboost_growth, _xgboost_growth_batch, PUBLIC),
+}
+
+
+# ==================== Request handling ====================
+
+class _BadRequest(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class _CSRFCheck(CsrfViewMiddleware):
+    """CsrfViewMiddleware's check run from a CSRF-exempt view, returning the failure reason"""
+
+    def _reject(self, request, reason):
+        return reason
+
+
+def _has_api_token(request):
+    """
+    True when the request carries 'Authorization: Bearer <settings.ML_API_TOKEN>', False without the header
+    Raises:
+        _BadRequest (401) for any other Authorization header, including when no token is configured
+    """
+    header = request.headers.get('Authorization', '')
+    if not header:
+        return False
+    token = getattr(settings, 'ML_API_TOKEN', None)
+    scheme, _, supplied = header.partition(' ')
+    if (not token or scheme.lower() != 'bearer'
+            or not hmac.compare_digest(supplied.strip().encode(), token.encode())):
+        raise _BadRequest('Invalid API token', status=401)
+    return True
+
+
+def _authorize(request, access):
+    """
+    Let a call through with the API token, or with the same checks as the HTML view
+    Args:
+        access: PUBLIC, LOGIN, JOB_SEEKER or STAFF, applied when no token is sent
+    Returns:
+        Largest batch size allowed for this caller
+    Raises:
+        _BadRequest (401/403) when the caller may not use the route
+    """
+    if _has_api_token(request):
+        return MAX_BATCH_SIZE
+    if access == PUBLIC:
+        return MAX_PUBLIC_BATCH_SIZE
+
+    user = request.user
+    if not user.is_authenticated:
+        raise _BadRequest('Log in or send the API token to use this route', status=401)
+    if access == JOB_SEEKER and user.role != 'job_seeker':
+        raise _BadRequest('This route is only available to job seekers', status=403)
+    if access == STAFF and not user.is_staff:
+        raise _BadRequest('This route is only available to staff users', status=403)
+
+    # The session cookie authenticates this call, so it needs the CSRF token like the HTML forms
+    reason = _CSRFCheck(lambda request: None).process_view(request, None, (), {})
+    if reason:
+        raise _BadRequest(f'CSRF check failed: {reason}', status=403)
+    return MAX_PUBLIC_BATCH_SIZE
+
+
+def _parse_body(request):
+    """Request payload from a JSON or form-encoded body"""
+    content_type = request.content_type or ''
+    if content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'null')
+        except (ValueError, UnicodeDecodeError) as e:
+            raise _BadRequest(f'Invalid JSON: {e}')
+    if content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        return request.POST.dict()
+    raise _BadRequest(
+        'Unsupported content type; send application/json or form data', status=415
+    )
+
+
+def _get_predictor(name):
+    entry = PREDICTORS.get(name)
+    if entry is None:
+        raise _BadRequest(f"Unknown predictor '{name}'", status=404)
+    return entry
+
+
+def _status_for(result):
+    if isinstance(result, dict) and (result.get('success') is False or 'error' in result):
+        return 400
+    return 200
+
+
+@require_GET
+def api_index(request):
+    """List the available predictor routes"""
+    return _json({
+        'predictors': sorted(PREDICTORS),
+        'batch': sorted(name for name, (_, batch, _) in PREDICTORS.items() if batch is not None),
+        'max_batch_size': MAX_BATCH_SIZE,
+        'max_public_batch_size': MAX_PUBLIC_BATCH_SIZE,
+    })
+
+
+@require_GET
+def api_metrics(request):
+    """Prediction cache, micro-batcher, inference executor and warm-up metrics for this process"""
+    try:
+        _authorize(request, STAFF)
+    except _BadRequest as e:
+        return _error(str(e), e.status)
+
+    from ml_models.batching import batcher_metrics
+    from ml_models.cache import prediction_cache
+    from ml_models.executor import get_executor
+    from ml_models.warmup import warmup_timings
+    return _json({
+        'pid': os.getpid(),
+        'prediction_cache': prediction_cache.stats(),
+        'microbatch': batcher_metrics(),
+        'executor': get_executor().stats(),
+        'warmup': warmup_timings(),
+    })
+
+
+@csrf_exempt
+@require_POST
+def predict(request, name):
+    """Single prediction: body is one input object, response is the predictor's result"""
+    try:
+        single, _, access = _get_predictor(name)
+        _authorize(request, access)
+        data = _parse_body(request)
+        if not isinstance(data, dict):
+            raise _BadRequest('Request body must be a JSON object')
+    except _BadRequest as e:
+        return _error(str(e), e.status)
+
+    result = single(data)
+    return _json(result, status=_status_for(result))
+
+
+@csrf_exempt
+@require_POST
+def predict_batch(request, name):
+    """
+    Batch prediction: body is {"inputs": [...]}, response is {"results": [...]} in the same order
+    Predictors with a vectorized batch path score all inputs with one model call.
+    """
+    try:
+        single, batch, access = _get_predictor(name)
+        max_batch_size = _authorize(request, access)
+        data = _parse_body(request)
+        inputs = data.get('inputs') if isinstance(data, dict) else None
+        if not isinstance(inputs, list) or not all(isinstance(item, dict) for item in inputs):
+            raise _BadRequest('Request body must be {"inputs": [object, ...]}')
+        if len(inputs) > max_batch_size:
+            raise _BadRequest(f'At most {max_batch_size} inputs per batch', status=413)
+    except _BadRequest as e:
+        return _error(str(e), e.status)
+
+    if batch is not None:
+        results = batch(inputs)
+    else:
+        results = [single(item) for item in inputs]
+    return _json({'results': results})
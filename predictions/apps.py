@@ -1,5 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PredictionsConfig(AppConfig):
     name = 'predictions'
+
+    def ready(self):
+        # Opt-in: load the salary model in the background at process start
+        if getattr(settings, 'ML_SALARY_MODEL_WARMUP', False):
+            from ml_models.predictors.salary_predictor_regression import warm_up_model
+            warm_up_model(background=True)
+
+        # Opt-in: run every predictor once at process start
+        warmup = getattr(settings, 'ML_WARMUP', None) or {}
+        if warmup.get('ON_READY', False):
+            from ml_models.warmup import warm_up_in_background, warm_up_predictors
+            if warmup.get('BACKGROUND', True):
+                warm_up_in_background()
+            else:
+                warm_up_predictors()
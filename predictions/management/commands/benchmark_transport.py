@@ -0,0 +1,107 @@
+import multiprocessing
+import pickle
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_models.transport import receive_frame, send_frame
+
+SAMPLE_TITLES = ['Data Analyst', 'Senior Data Engineer', 'Data Scientist', 'Machine Learning Engineer',
+                 'Business Analyst', 'Lead Software Engineer', 'Cloud Engineer', 'Junior Data Analyst']
+SAMPLE_COUNTRIES = ['United States', 'France', 'Germany', 'India', 'Canada', 'Tunisia']
+SAMPLE_SKILLS = ['python', 'sql', 'aws', 'excel', 'tableau', 'spark', 'azure', 'power bi', 'java',
+                 'pandas', 'docker', 'kubernetes', 'r', 'scala', 'airflow', 'snowflake']
+
+
+def _receive_pickled(df):
+    """Worker task for the pickle transport (the executor pickles the DataFrame argument)"""
+    return df.shape
+
+
+def _receive_shared(descriptor):
+    """Worker task for the shared memory transport"""
+    with receive_frame(descriptor) as df:
+        return df.shape
+
+
+def build_salary_frame(rows, seed=0):
+    """Salary feature frame (same builder as predict_salary_batch) for synthetic postings"""
+    from ml_models.predictors.salary_predictor_regression import prepare_complete_features_batch
+
+    rng = random.Random(seed)
+    records = [{
+        'job_title_short': rng.choice(SAMPLE_TITLES),
+        'job_country': rng.choice(SAMPLE_COUNTRIES),
+        'skills_text': ', '.join(rng.sample(SAMPLE_SKILLS, rng.randint(2, 8))),
+        'remote_option': rng.randint(0, 1),
+    } for _ in range(rows)]
+    X, _ = prepare_complete_features_batch(records)
+    return X
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark pickle vs shared-memory transport of salary feature frames '
+        'to an inference worker process'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1, 100, 10000],
+            help='Batch sizes to measure (default: 1 100 10000)',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Round trips per batch size and transport (default: 20)',
+        )
+        parser.add_argument(
+            '--start-method', default='forkserver',
+            choices=multiprocessing.get_all_start_methods(),
+            help='Worker start method (default: forkserver, as the process backend)',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or any(rows < 1 for rows in options['rows']):
+            raise CommandError('--rows and --repeat must be positive')
+
+        context = multiprocessing.get_context(options['start_method'])
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            # Start the worker before timing
+            pool.submit(_receive_pickled, build_salary_frame(1)).result()
+
+            self.stdout.write(
+                f"{'rows':>8} {'cols':>5} {'pickle ms':>10} {'shm ms':>10} {'speedup':>8} "
+                f"{'pickle KB':>10} {'shm desc KB':>12}"
+            )
+            for rows in options['rows']:
+                df = build_salary_frame(rows)
+                pickle_ms = self._time(lambda: pool.submit(_receive_pickled, df).result(), options['repeat'])
+                shm_ms = self._time(lambda: self._shared_round_trip(pool, df), options['repeat'])
+
+                pickled_kb = len(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)) / 1024
+                with send_frame(df) as descriptor:
+                    descriptor_kb = len(pickle.dumps(descriptor, protocol=pickle.HIGHEST_PROTOCOL)) / 1024
+
+                self.stdout.write(
+                    f"{rows:>8} {df.shape[1]:>5} {pickle_ms:>10.3f} {shm_ms:>10.3f} "
+                    f"{pickle_ms / shm_ms:>7.2f}x {pickled_kb:>10.1f} {descriptor_kb:>12.1f}"
+                )
+
+        self.stdout.write(self.style.SUCCESS('Median round trip per batch, including encode and decode'))
+
+    @staticmethod
+    def _shared_round_trip(pool, df):
+        with send_frame(df) as descriptor:
+            return pool.submit(_receive_shared, descriptor).result()
+
+    @staticmethod
+    def _time(fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_models.category_codes import CategoryCodeTable
+
+
+DEFAULT_COLUMNS = ['job_title_short', 'job_via', 'company_name', 'job_country', 'search_location']
+DEFAULT_OUTPUT = Path(settings.BASE_DIR) / 'ml_models' / 'models' / 'xgb_category_codes(jojo).json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the category -> code table used by the degree predictors from the '
+        'training data the XGBoost degree classifier was fitted on'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('data', help='Training data CSV file')
+        parser.add_argument(
+            '--columns', nargs='+', default=DEFAULT_COLUMNS,
+            help='Categorical columns to encode (default: the degree model columns)',
+        )
+        parser.add_argument(
+            '--output', default=str(DEFAULT_OUTPUT),
+            help=f'Output JSON path (default: {DEFAULT_OUTPUT.name} next to xgb_features(jojo).pkl)',
+        )
+
+    def handle(self, *args, **options):
+        import pandas as pd
+
+        data_path = Path(options['data'])
+        if not data_path.exists():
+            raise CommandError(f'File not found: {data_path}')
+
+        columns = options['columns']
+        data = pd.read_csv(data_path, usecols=columns, dtype=str, keep_default_na=False)
+
+        table = CategoryCodeTable.fit(data, columns)
+        table.save(options['output'])
+
+        for col in columns:
+            self.stdout.write(f'{col}: {len(table.columns[col])} categories')
+        self.stdout.write(self.style.SUCCESS(f"Saved category codes to {options['output']}"))
@@ -0,0 +1,94 @@
+import time
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_models.artifacts import LOADERS
+from ml_models.native import NATIVE_EXPORTS, export_model, load_native, manifest_path
+
+MODELS_DIR = Path(__file__).resolve().parents[3] / 'ml_models' / 'models'
+
+
+def _final_estimator(model):
+    return model.steps[-1][1] if hasattr(model, 'steps') else model
+
+
+def verify_export(original, native, rows=1000, seed=0):
+    """
+    Compare the original and native estimators on random feature matrices
+    Returns the largest absolute difference between their outputs (0.0 = bit-identical).
+    """
+    original = _final_estimator(original)
+    native = _final_estimator(native)
+    n_features = (native.booster_.num_feature() if hasattr(native, 'booster_')
+                  else original.n_features_in_)
+    X = np.random.RandomState(seed).uniform(-5, 100, size=(rows, n_features)).astype(np.float32)
+
+    if hasattr(original, 'predict_proba'):
+        a, b = original.predict_proba(X), native.predict_proba(X)
+        if not np.array_equal(original.predict(X), native.predict(X)):
+            return float('inf')
+    else:
+        a, b = original.predict(X), native.predict(X)
+    return float(np.max(np.abs(np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64))))
+
+
+class Command(BaseCommand):
+    help = (
+        'Export pickled XGBoost / LightGBM models to their native formats '
+        '(UBJSON, LightGBM model text) so predictors load those instead'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', default=NATIVE_EXPORTS,
+            help='Pickled model files in ml_models/models (default: every known booster)',
+        )
+        parser.add_argument(
+            '--no-verify', action='store_true',
+            help='Skip comparing native and pickled predictions after export',
+        )
+
+    def handle(self, *args, **options):
+        failed = False
+        for filename in options['models']:
+            pkl_path = MODELS_DIR / filename
+            if not pkl_path.exists():
+                self.stdout.write(self.style.WARNING(f'✗ {filename}: not found'))
+                failed = True
+                continue
+
+            start = time.perf_counter()
+            original = LOADERS['joblib'](pkl_path)
+            pickle_seconds = time.perf_counter() - start
+
+            try:
+                manifest = export_model(pkl_path, original)
+            except ValueError as e:
+                self.stdout.write(self.style.WARNING(f'✗ {e}'))
+                failed = True
+                continue
+
+            start = time.perf_counter()
+            native = load_native(manifest_path(pkl_path))
+            native_seconds = time.perf_counter() - start
+
+            files = [manifest['model']] + ([manifest['preprocessing']] if 'preprocessing' in manifest else [])
+            self.stdout.write(self.style.SUCCESS(
+                f"[OK] {filename} -> {', '.join(files)} ({manifest['format']}); "
+                f"load {pickle_seconds:.3f}s pickle vs {native_seconds:.3f}s native"
+            ))
+
+            if not options['no_verify']:
+                diff = verify_export(original, native)
+                if diff == 0.0:
+                    self.stdout.write('     predictions identical')
+                else:
+                    self.stdout.write(self.style.ERROR(f'     predictions differ (max abs diff {diff})'))
+                    manifest_path(pkl_path).unlink()
+                    self.stdout.write(self.style.ERROR('     manifest removed; the pickle stays in use'))
+                    failed = True
+
+        if failed:
+            raise CommandError('Some models were not exported')
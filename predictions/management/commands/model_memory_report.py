@@ -0,0 +1,143 @@
+import gc
+import os
+import signal
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def read_memory(pid):
+    """
+    Read USS, PSS and RSS of a process from /proc (values in kB)
+    USS (unique set size) = Private_Clean + Private_Dirty: memory that would be freed if the process exited.
+    """
+    proc = Path('/proc') / str(pid)
+    rollup = proc / 'smaps_rollup'
+    source = rollup if rollup.exists() else proc / 'smaps'
+
+    totals = {'Rss': 0, 'Pss': 0, 'Private_Clean': 0, 'Private_Dirty': 0}
+    with open(source) as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in totals:
+                totals[key] += int(rest.split()[0])
+
+    return {
+        'uss': totals['Private_Clean'] + totals['Private_Dirty'],
+        'pss': totals['Pss'],
+        'rss': totals['Rss'],
+    }
+
+
+def child_pids(pid):
+    """PIDs of the direct children of a process (e.g. a gunicorn master's workers)"""
+    children = set()
+    task_dir = Path('/proc') / str(pid) / 'task'
+    for task in task_dir.iterdir():
+        children_file = task / 'children'
+        if children_file.exists():
+            children.update(int(p) for p in children_file.read_text().split())
+    return sorted(children)
+
+
+class Command(BaseCommand):
+    help = (
+        'Report per-worker unique memory (USS) for forked workers, with and without '
+        'loading the ML models in the parent before fork'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of workers to fork for each scenario (default: 4)',
+        )
+        parser.add_argument(
+            '--pid', type=int,
+            help='Instead of simulating, report the workers of a running gunicorn master',
+        )
+
+    def handle(self, *args, **options):
+        if not Path('/proc/self/smaps').exists():
+            raise CommandError('USS measurement requires Linux /proc smaps')
+
+        if options['pid']:
+            pids = child_pids(options['pid'])
+            if not pids:
+                raise CommandError(f"No worker processes found under PID {options['pid']}")
+            self._report('Running workers', pids)
+            return
+
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be at least 1')
+
+        # Before: each worker loads its own copy of the models after fork
+        before = self._run_scenario('Before (models loaded in each worker)', workers, preload=False)
+
+        # After: models loaded in the parent and the GC heap frozen before fork
+        from ml_models.preload import preload_models
+        preload_models(freeze=True)
+        after = self._run_scenario('After (preloaded in parent + gc.freeze)', workers, preload=True)
+
+        saved_kb = before - after
+        self.stdout.write(self.style.SUCCESS('\n' + '=' * 50))
+        self.stdout.write(self.style.SUCCESS(f'Total worker USS before: {before / 1024:.1f} MB'))
+        self.stdout.write(self.style.SUCCESS(f'Total worker USS after:  {after / 1024:.1f} MB'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved: {saved_kb / 1024:.1f} MB ({saved_kb / workers / 1024:.1f} MB per worker)'
+        ))
+        self.stdout.write(self.style.SUCCESS('=' * 50))
+
+    def _run_scenario(self, title, workers, preload):
+        """Fork workers, wait until each has loaded/touched the models, measure, then stop them"""
+        pids = []
+        for _ in range(workers):
+            ready_r, ready_w = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(ready_r)
+                self._worker(ready_w, preload)
+            os.close(ready_w)
+            # Block until the worker reports it is ready
+            os.read(ready_r, 1)
+            os.close(ready_r)
+            pids.append(pid)
+
+        try:
+            return self._report(title, pids)
+        finally:
+            for pid in pids:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+
+    def _worker(self, ready_w, preload):
+        """Body of a forked worker; never returns"""
+        status = 0
+        try:
+            if not preload:
+                from ml_models.preload import preload_models
+                preload_models(freeze=False)
+            # A full collection walks every tracked object, as a long-lived worker eventually does
+            gc.collect()
+            os.write(ready_w, b'1')
+            while True:
+                time.sleep(60)
+        except BaseException:
+            status = 1
+            os.write(ready_w, b'0')
+        finally:
+            os._exit(status)
+
+    def _report(self, title, pids):
+        self.stdout.write(self.style.SUCCESS(f'\n{title}'))
+        self.stdout.write(f"{'PID':>8} {'USS MB':>10} {'PSS MB':>10} {'RSS MB':>10}")
+        total_uss = 0
+        for pid in pids:
+            mem = read_memory(pid)
+            total_uss += mem['uss']
+            self.stdout.write(
+                f"{pid:>8} {mem['uss'] / 1024:>10.1f} {mem['pss'] / 1024:>10.1f} {mem['rss'] / 1024:>10.1f}"
+            )
+        self.stdout.write(f"{'avg':>8} {total_uss / len(pids) / 1024:>10.1f}")
+        return total_uss
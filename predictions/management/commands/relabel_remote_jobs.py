@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.models import Job
+
+
+def job_to_remote_input(job):
+    """Map a Job posting onto the remote work model inputs"""
+    text_block = '\n'.join(part for part in (job.title, job.description, job.requirements) if part)
+    return {
+        'job_title_short': job.title,
+        'job_seniority': job.get_experience_level_display() if job.experience_level else 'Unknown',
+        'job_country': job.location,
+        'job_schedule_type': job.get_job_type_display(),
+        'text_block': text_block,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Relabel Job.remote_option for every posting with the remote work model (batched)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Postings per model call and database update (default: 2000)',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Predict and report changes without saving them',
+        )
+
+    def handle(self, *args, **options):
+        from ml_models.predictors.remote_work_predictor import predict_remote_work_batch
+
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        jobs = Job.objects.only(
+            'id', 'title', 'description', 'requirements', 'location',
+            'job_type', 'experience_level', 'remote_option',
+        ).order_by('id')
+
+        total = changed = failed = 0
+        batch = []
+        for job in jobs.iterator(chunk_size=batch_size):
+            batch.append(job)
+            if len(batch) == batch_size:
+                c, f = self._relabel(batch, predict_remote_work_batch, options['dry_run'])
+                total += len(batch)
+                changed += c
+                failed += f
+                batch = []
+        if batch:
+            c, f = self._relabel(batch, predict_remote_work_batch, options['dry_run'])
+            total += len(batch)
+            changed += c
+            failed += f
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Processed {total} jobs: {changed} relabelled, {failed} failed'
+        ))
+
+    def _relabel(self, jobs, predict_batch, dry_run):
+        """Predict one batch and save the postings whose label changed"""
+        results = predict_batch([job_to_remote_input(job) for job in jobs])
+
+        updated = []
+        failed = 0
+        for job, result in zip(jobs, results):
+            if not result['success']:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"Job {job.id}: {result['error']}"))
+                continue
+            remote = result['prediction'] == 'Remote'
+            if job.remote_option != remote:
+                job.remote_option = remote
+                updated.append(job)
+
+        if updated and not dry_run:
+            Job.objects.bulk_update(updated, ['remote_option'])
+        return len(updated), failed
@@ -1,3 +1,602 @@
-from django.test import TestCase
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from predictions.api import views as api_views
+
+# Loaded on the first prediction, never just to resolve URLs or run a management command
+HEAVY_MODULES = ['numpy', 'pandas', 'scipy', 'sklearn', 'xgboost', 'lightgbm', 'joblib']
+
+# Cumulative import time allowed for `manage.py check`, in seconds (about 0.3s when
+# lazy; importing the ML stack eagerly took over 2s)
+IMPORT_TIME_BUDGET = 1.0
+
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output
+    Returns:
+        Dictionary of module name -> (self seconds, cumulative seconds, nesting level)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # header line
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6, level)
+    return modules
+
+
+class ImportTimeBudgetTests(SimpleTestCase):
+    """`manage.py check` imports every URLconf and view, but none of the ML stack"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', 'manage.py', 'check'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=300,
+        )
+        cls.returncode = result.returncode
+        cls.modules = parse_importtime(result.stderr)
+
+    def test_check_succeeds(self):
+        self.assertEqual(self.returncode, 0)
+        self.assertIn('predictions.views', self.modules)
+
+    def test_heavy_modules_not_imported(self):
+        imported = [name for name in HEAVY_MODULES if name in self.modules]
+        self.assertEqual(imported, [], 'manage.py check imported the ML stack')
+
+    def test_predictor_modules_not_imported(self):
+        imported = sorted(name for name in self.modules if name.startswith('ml_models.predictors.'))
+        self.assertEqual(imported, [])
+
+    def test_import_time_budget(self):
+        total = sum(cumulative for _, cumulative, level in self.modules.values() if level == 0)
+        self.assertLess(total, IMPORT_TIME_BUDGET, f'manage.py check spent {total:.2f}s importing modules')
+
+
+
+@override_settings(ML_API_TOKEN='test-token')
+class APIAccessTests(SimpleTestCase):
+    """Without the API token, API routes apply the checks of the matching HTML views"""
+
+    def post(self, url, data, **headers):
+        return self.client.post(url, data, content_type='application/json', headers=headers)
+
+    def session_post(self, view, name, role, data=None):
+        """Call an API view as a logged-in user whose request has no CSRF token"""
+        request = RequestFactory().post(f'/predictions/api/{name}/', data or {}, content_type='application/json')
+        request.user = SimpleNamespace(is_authenticated=True, role=role, is_staff=False)
+        return view(request, name)
+
+    def test_anonymous_login_route_refused(self):
+        response = self.post('/predictions/api/salary/', {'job_title_short': 'Data Scientist'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_job_seeker_route_refuses_employer(self):
+        response = self.session_post(api_views.predict, 'health-insurance', 'employer')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn(b'job seekers', response.content)
+
+    def test_session_call_needs_csrf_token(self):
+        response = self.session_post(api_views.predict_batch, 'salary', 'job_seeker', {'inputs': []})
+        self.assertEqual(response.status_code, 403)
+        self.assertIn(b'CSRF', response.content)
+
+    def test_anonymous_batch_size_capped(self):
+        inputs = [{}] * (api_views.MAX_PUBLIC_BATCH_SIZE + 1)
+        response = self.post('/predictions/api/batch/remote-work/', {'inputs': inputs})
+        self.assertEqual(response.status_code, 413)
+
+    def test_wrong_token_refused(self):
+        response = self.post('/predictions/api/remote-work/', {}, Authorization='Bearer wrong')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(ML_API_TOKEN=None)
+    def test_no_token_configured_refuses_bearer(self):
+        response = self.post('/predictions/api/batch/salary/', {'inputs': []}, Authorization='Bearer x')
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_allows_login_route(self):
+        response = self.post('/predictions/api/batch/salary/', {'inputs': []}, Authorization='Bearer test-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'results': []})
+
+    def test_metrics_need_token_or_staff(self):
+        self.assertEqual(self.client.get('/predictions/api/metrics/').status_code, 401)
+        response = self.client.get('/predictions/api/metrics/', headers={'Authorization': 'Bearer test-token'})
+        self.assertEqual(response.status_code, 200)
+
+
+MODELS_DIR = Path(settings.BASE_DIR) / 'ml_models' / 'models'
+
+
+class CompiledTreesTests(SimpleTestCase):
+    """Compiled evaluators reproduce the shipped XGBoost models bit for bit"""
+
+    def check_model(self, filename):
+        import numpy as np
+        from ml_models.artifacts import artifact_cache
+        from ml_models.compiled_trees import compile_model, sample_inputs, verify
+
+        path = MODELS_DIR / filename
+        if not path.exists():
+            self.skipTest(f'{filename} not available')
+        model = artifact_cache.load(path)
+        compiled = compile_model(model)
+        rng = np.random.default_rng(1)
+
+        X = sample_inputs(compiled, rows=500)
+        with_nan = X[:100].copy()
+        with_nan[rng.random(with_nan.shape) < 0.3] = np.nan
+        # Rows with every feature missing, and with no one-hot feature set
+        all_missing = np.full((2, compiled.n_features), np.nan, dtype=np.float32)
+        all_zero = np.zeros((2, compiled.n_features), dtype=np.float32)
+        X = np.vstack([X, with_nan, all_missing, all_zero])
+
+        self.assertTrue(verify(compiled, X))
+
+        compiled.max_rows = len(X)
+        frame = X
+        if compiled.feature_names is not None:
+            import pandas as pd
+            frame = pd.DataFrame(X, columns=compiled.feature_names)
+        for method in ('predict', 'predict_proba'):
+            expected = np.asarray(getattr(model, method)(frame))
+            actual = np.asarray(getattr(compiled, method)(frame))
+            self.assertEqual(actual.dtype, expected.dtype, method)
+            np.testing.assert_array_equal(actual, expected, err_msg=method)
+
+    def test_xgb_classifier(self):
+        self.check_model('xgb_classifier_model(jojo).pkl')
+
+    def test_xgboost_growth(self):
+        self.check_model('xgboost_growth_model.pkl')
+
+
+class PredictionCacheTests(SimpleTestCase):
+    """Cache keys cover the model fingerprint and time bucket; entries are bounded"""
+
+    def setUp(self):
+        from ml_models.cache import PredictionCache
+        self.cache = PredictionCache(max_entries=2, ttl_seconds=60)
+        self.calls = []
+
+    def compute(self, value='result'):
+        def compute():
+            self.calls.append(value)
+            return value
+        return compute
+
+    def lookup(self, features=None, value='result', **kwargs):
+        return self.cache.get_or_compute('test', features or {'x': 1}, self.compute(value), **kwargs)
+
+    def test_hit_for_same_inputs(self):
+        self.assertEqual(self.lookup(fingerprint='a'), 'result')
+        self.assertEqual(self.lookup(fingerprint='a', value='other'), 'result')
+        self.assertEqual(self.calls, ['result'])
+
+    def test_fingerprint_is_part_of_key(self):
+        self.lookup(fingerprint='a')
+        self.assertEqual(self.lookup(fingerprint='b', value='new'), 'new')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_time_bucket_is_part_of_key(self):
+        self.lookup(time_bucket=1)
+        self.assertEqual(self.lookup(time_bucket=2, value='new'), 'new')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_should_store_false_not_cached(self):
+        self.lookup(should_store=lambda value: False)
+        self.lookup(should_store=lambda value: False)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_lru_eviction_at_capacity(self):
+        self.lookup({'x': 1})
+        self.lookup({'x': 2})
+        self.lookup({'x': 1})  # most recently used
+        self.lookup({'x': 3})  # evicts {'x': 2}
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.lookup({'x': 1})
+        self.assertEqual(len(self.calls), 3)
+        self.lookup({'x': 2})
+        self.assertEqual(len(self.calls), 4)
+
+    def test_ttl_expiry(self):
+        with mock.patch('ml_models.cache.time.monotonic', return_value=1000.0):
+            self.lookup()
+        with mock.patch('ml_models.cache.time.monotonic', return_value=1059.0):
+            self.lookup()
+        self.assertEqual(len(self.calls), 1)
+        with mock.patch('ml_models.cache.time.monotonic', return_value=1060.0):
+            self.lookup()
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+    def test_clear_empties_cache(self):
+        self.lookup()
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['size'], 0)
+        self.lookup()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_salary_keyed_by_resident_model_digest(self):
+        import numpy as np
+        from ml_models.predictors import salary_predictor_regression as salary
+
+        class CountingModel:
+            calls = 0
+
+            def predict(self, X):
+                CountingModel.calls += 1
+                return np.full(len(X), np.log(50000.0))
+
+        version = SimpleNamespace(model=CountingModel(), digest='v1')
+        data = {'job_title_short': 'Data Scientist', 'job_country': 'US', 'skills_text': 'python, sql'}
+        with mock.patch.object(salary, 'prediction_cache', self.cache), \
+                mock.patch.object(salary, '_get_version', lambda: version):
+            salary.predict_salary(data)
+            salary.predict_salary(data)
+            self.assertEqual(CountingModel.calls, 1)
+            # A reload swaps the version the registry hands out, and with it the key
+            version = SimpleNamespace(model=CountingModel(), digest='v2')
+            self.assertTrue(salary.predict_salary(data)['success'])
+            self.assertEqual(CountingModel.calls, 2)
+
+
+class InferenceBackpressureTests(SimpleTestCase):
+    """A full inference executor rejects work at once, and views answer 503"""
+
+    def setUp(self):
+        from ml_models.executor import InferenceExecutor
+        self.executor = InferenceExecutor(max_workers=1, max_queue=0)
+        self.release = threading.Event()
+        self.running = threading.Event()
+
+        def hold():
+            self.running.set()
+            self.release.wait(10)
+
+        self.held = self.executor.submit(hold)
+        self.assertTrue(self.running.wait(10))
+
+    def tearDown(self):
+        self.release.set()
+        self.held.result(10)
+        self.executor._pool.shutdown(wait=True)
+
+    def test_submit_beyond_capacity_raises(self):
+        from ml_models.executor import InferenceQueueFull
+        with self.assertRaises(InferenceQueueFull):
+            self.executor.submit(lambda: None)
+        self.assertEqual(self.executor.stats()['rejected'], 1)
+
+        # The slot frees once the held job's done callback has run
+        self.release.set()
+        self.held.result(10)
+        while self.executor.stats()['in_flight']:
+            threading.Event().wait(0.01)
+        self.assertEqual(self.executor.submit(lambda: 'ran').result(10), 'ran')
+
+    def test_view_returns_503_with_retry_after(self):
+        from ml_models import executor
+        with mock.patch.object(executor, '_EXECUTOR', self.executor), \
+                mock.patch.object(executor, '_EXECUTOR_PID', os.getpid()):
+            response = self.client.post('/predictions/degree-mention/', {
+                'skill_count': '3', 'job_title_short': 'Data Analyst', 'job_via': 'LinkedIn',
+            })
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class MicroBatcherTests(SimpleTestCase):
+    """Concurrent submits share one batch_fn call and each caller gets its own output"""
+
+    def submit_concurrently(self, batcher, items):
+        """Submit every item from its own thread at once; returns item -> output or exception"""
+        results = {}
+        barrier = threading.Barrier(len(items))
+
+        def call(item):
+            barrier.wait(10)
+            try:
+                results[item] = batcher.submit(item, timeout=10)
+            except Exception as e:
+                results[item] = e
+
+        threads = [threading.Thread(target=call, args=(item,)) for item in items]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(15)
+        self.assertFalse(any(thread.is_alive() for thread in threads), 'a caller never got its result')
+        return results
+
+    def test_concurrent_submits_merged_in_order(self):
+        from ml_models.batching import MicroBatcher
+        calls = []
+
+        def batch_fn(items):
+            calls.append(list(items))
+            return [(item, position) for position, item in enumerate(items)]
+
+        batcher = MicroBatcher('test', batch_fn, max_batch_size=8, max_wait_ms=500)
+        results = self.submit_concurrently(batcher, list(range(8)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertCountEqual(calls[0], range(8))
+        for item, (echoed, position) in results.items():
+            self.assertEqual(echoed, item)
+            self.assertEqual(calls[0][position], item)
+        self.assertEqual(batcher.metrics()['max_batch_size_seen'], 8)
+
+    def test_exception_reaches_every_waiter(self):
+        from ml_models.batching import MicroBatcher
+        calls = []
+
+        def batch_fn(items):
+            calls.append(list(items))
+            raise ValueError('model failed')
+
+        batcher = MicroBatcher('test', batch_fn, max_batch_size=4, max_wait_ms=500)
+        results = self.submit_concurrently(batcher, list(range(4)))
+
+        self.assertEqual(len(calls), 1)
+        for result in results.values():
+            self.assertIsInstance(result, ValueError)
+        self.assertEqual(batcher.metrics()['errors'], 1)
+
+        # The collector keeps serving after a failed batch
+        batcher.batch_fn = lambda items: [item * 2 for item in items]
+        self.assertEqual(batcher.submit(21, timeout=10), 42)
+
+    @override_settings(ML_MICROBATCH={'ENABLED': True, 'MAX_BATCH_SIZE': 6, 'MAX_WAIT_MS': 500})
+    def test_single_row_predictions_share_one_model_call(self):
+        import numpy as np
+        import pandas as pd
+        from ml_models import batching
+
+        class CountingClassifier:
+            classes_ = np.array([0, 1])
+
+            def __init__(self):
+                self.batch_sizes = []
+
+            def predict_proba(self, X):
+                self.batch_sizes.append(len(X))
+                positive = X['x'].to_numpy(dtype=float) / 10
+                return np.column_stack([1 - positive, positive])
+
+        model = CountingClassifier()
+        results = {}
+        barrier = threading.Barrier(6)
+
+        def call(value):
+            barrier.wait(10)
+            frame = pd.DataFrame({'x': [value]})
+            results[value] = batching.batched_predict_with_proba('counting-test', lambda: model, frame)
+
+        with mock.patch.dict(batching._BATCHERS):
+            threads = [threading.Thread(target=call, args=(value,)) for value in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(15)
+
+        self.assertEqual(model.batch_sizes, [6])
+        for value, (labels, proba) in results.items():
+            self.assertEqual(labels.tolist(), [1 if value > 5 else 0])
+            np.testing.assert_allclose(proba, [[1 - value / 10, value / 10]])
+
+
+class FrameTransportTests(SimpleTestCase):
+    """Feature frames survive the shared memory round trip, and the segment is removed"""
+
+    def test_round_trip(self):
+        import numpy as np
+        import pandas as pd
+        from multiprocessing import shared_memory
+        from ml_models.transport import CODE_DTYPE, receive_frame, send_frame
+
+        df = pd.DataFrame({
+            'workers': np.array([10.5, 0.0, np.nan, 3.25], dtype=np.float64),
+            'industry': pd.Categorical(['IT', 'Health', None, 'IT'], categories=['Health', 'IT', 'Retail']),
+            'founded': np.array([1999, 2010, 2020, 1870], dtype=np.int64),
+            'title': ['Data Analyst', None, 'Engineer', 'Data Analyst'],
+            'ratio': np.array([0.5, 1.5, -2.0, 0.0], dtype=np.float32),
+            'level': pd.Categorical(['low', 'high', 'low', 'mid'], categories=['low', 'mid', 'high'], ordered=True),
+            'remote': [True, False, False, True],
+            'country': ['US', np.nan, 'FR', np.nan],
+            'skills': np.array([3, 0, 7, 1], dtype=np.int32),
+        })
+
+        with send_frame(df) as descriptor:
+            name = descriptor['shm']
+            # Categorical and object columns travel as int32 codes, their vocabularies in the descriptor
+            self.assertEqual(set(descriptor['categorical']), {'industry', 'title', 'level', 'country'})
+            for block in descriptor['blocks']:
+                if block['columns'][0] in descriptor['categorical']:
+                    self.assertEqual(block['dtype'], CODE_DTYPE.str)
+            with receive_frame(descriptor) as received:
+                pd.testing.assert_frame_equal(received, df)
+            self.assertEqual(list(received.columns), list(df.columns))
+            self.assertIsNone(received['title'][1])
+            self.assertTrue(np.isnan(received['country'][1]))
+
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_empty_frame(self):
+        import pandas as pd
+        from ml_models.transport import receive_frame, send_frame
+
+        df = pd.DataFrame({'workers': pd.Series([], dtype='float64'), 'title': pd.Series([], dtype=object)})
+        with send_frame(df) as descriptor:
+            with receive_frame(descriptor) as received:
+                self.assertEqual(list(received.columns), ['workers', 'title'])
+                self.assertEqual(len(received), 0)
+
+
+@override_settings(ML_MODEL_RELOAD={'ENABLED': False})
+class ModelReloadTests(SimpleTestCase):
+    """The registry swaps in new model files once they settle, together, and only when they prepare"""
+
+    def setUp(self):
+        from ml_models.models_loader import ModelsLoader
+        # A registry of its own, so the process-wide one keeps its models
+        with mock.patch.object(ModelsLoader, '_instance', None):
+            self.loader = ModelsLoader()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.loader.models_dir = Path(tmp.name)
+        self.mtime = 1_000_000_000_000_000_000
+
+    def write(self, filename, obj):
+        path = self.loader.models_dir / filename
+        path.write_bytes(pickle.dumps(obj))
+        # A distinct mtime per write, however coarse the filesystem clock
+        self.mtime += 1_000_000_000
+        os.utime(path, ns=(self.mtime, self.mtime))
+
+    def deploy(self, model, features):
+        self.write('xgboost_growth_model.pkl', model)
+        self.write('model_features.pkl', features)
+
+    def current(self):
+        return self.loader.get_model('xgboost_growth'), self.loader.get_model('model_features')
+
+    def test_change_applied_after_two_agreeing_scans(self):
+        self.deploy({'model': 1}, ['a'])
+        self.assertEqual(self.current(), ({'model': 1}, ['a']))
+        self.loader.check_for_updates()
+        self.loader.check_for_updates()
+
+        self.deploy({'model': 2}, ['a', 'b'])
+        self.assertEqual(self.loader.check_for_updates(), [])
+        self.assertEqual(self.current(), ({'model': 1}, ['a']))
+
+        # Still changing (a copy in progress): wait for a stable directory
+        self.write('model_features.pkl', ['a', 'b', 'c'])
+        self.assertEqual(self.loader.check_for_updates(), [])
+        self.assertEqual(self.current(), ({'model': 1}, ['a']))
+
+        self.assertCountEqual(self.loader.check_for_updates(), ['xgboost_growth', 'model_features'])
+        self.assertEqual(self.current(), ({'model': 2}, ['a', 'b', 'c']))
+        self.assertEqual(self.loader.get_version('xgboost_growth').version, 2)
+
+    def test_model_and_features_switch_together(self):
+        self.deploy({'model': 1}, ['a'])
+        self.current()
+        self.loader.check_for_updates()
+        self.loader.check_for_updates()
+
+        # Features are prepared after the new model is staged, while requests still see the old pair
+        seen_while_staging = []
+        self.loader.add_preparer(
+            'model_features', 'layout',
+            lambda features: seen_while_staging.append((self.current(), list(features))) or len(features),
+        )
+        old_features = self.loader.get_version('model_features')
+
+        self.deploy({'model': 2}, ['a', 'b'])
+        self.loader.check_for_updates()
+        self.loader.check_for_updates()
+
+        self.assertIn((({'model': 1}, ['a']), ['a', 'b']), seen_while_staging)
+        self.assertEqual(self.current(), ({'model': 2}, ['a', 'b']))
+        new_features = self.loader.get_version('model_features')
+        self.assertEqual(self.loader.prepared('model_features', new_features, 'layout'), 2)
+        # A request that pinned the old version keeps its own prepared objects
+        self.assertEqual(self.loader.prepared('model_features', old_features, 'layout'), 1)
+
+    def test_failed_preparer_keeps_old_version(self):
+        def prepare(model):
+            if model.get('broken'):
+                raise ValueError('cannot compile')
+            return 'compiled'
+
+        self.loader.add_preparer('xgboost_growth', 'compiled', prepare)
+        self.deploy({'model': 1}, ['a'])
+        old = self.loader.get_version('xgboost_growth')
+        self.assertEqual(self.loader.prepared('xgboost_growth', old, 'compiled'), 'compiled')
+        self.loader.check_for_updates()
+        self.loader.check_for_updates()
+
+        self.write('xgboost_growth_model.pkl', {'model': 2, 'broken': True})
+        self.loader.check_for_updates()
+        self.assertEqual(self.loader.check_for_updates(), [])
+
+        self.assertIs(self.loader.get_version('xgboost_growth'), old)
+        stats = self.loader.get_model_stats('xgboost_growth')
+        self.assertEqual(stats['version'], 1)
+        self.assertIn('cannot compile', stats['reload_error'])
+
+
+class SalaryBatchTests(SimpleTestCase):
+    """predict_salary_batch answers every row exactly like predict_salary"""
+
+    RECORDS = [
+        {'job_title_short': 'Data Scientist', 'job_country': 'US', 'skills_text': 'python, sql', 'remote_option': 1},
+        {'job_title_short': 'Senior Data Engineer', 'job_country': 'France', 'job_state': 'Paris',
+         'skills_text': 'spark, aws, airflow', 'job_schedule_type': 'part_time', 'remote_option': '0'},
+        {'job_title_short': 'Data Analyst', 'job_country': 'US', 'skills_text': 'excel', 'remote_option': 'maybe'},
+        {'job_title_short': 'ML Engineer', 'job_country': 'Germany', 'skills_text': 'pytorch, docker',
+         'remote_option': None},
+        {'job_title_short': 'Data Analyst', 'job_country': 'US', 'skills_text': 'tableau, sql', 'remote_option': 2},
+        {'job_title_short': '', 'job_country': 'US', 'skills_text': 'python'},
+        {'job_title_short': 'Business Analyst', 'job_country': 'Canada', 'skills_text': 'power bi',
+         'remote_option': '1'},
+    ]
+
+    def setUp(self):
+        import numpy as np
+        from ml_models.cache import PredictionCache
+        from ml_models.predictors import salary_predictor_regression as salary
+
+        class FeatureSumModel:
+            """Log-salary that depends on every feature, so rows cannot be mixed up unnoticed"""
+
+            def predict(self, X):
+                return 10.5 + 1e-4 * X.select_dtypes('number').to_numpy(dtype=float).sum(axis=1)
+
+        version = SimpleNamespace(model=FeatureSumModel(), digest='test')
+        self.salary = salary
+        for patcher in (mock.patch.object(salary, '_get_version', lambda: version),
+                        mock.patch.object(salary, 'prediction_cache', PredictionCache(enabled=False))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_batch_matches_single_predictions(self):
+        batch = self.salary.predict_salary_batch(self.RECORDS)
+        self.assertEqual(len(batch), len(self.RECORDS))
+        for record, result in zip(self.RECORDS, batch):
+            self.assertEqual(result, self.salary.predict_salary(record), record)
+
+    def test_invalid_remote_option_fails_only_its_row(self):
+        batch = self.salary.predict_salary_batch(self.RECORDS)
+        failed = [i for i, result in enumerate(batch) if not result['success']]
+        self.assertEqual(failed, [2, 4, 5])
+        self.assertIn('Remote option', batch[2]['error'])
+        self.assertIn('Remote option', batch[4]['error'])
+
+        # The remaining rows are scored as if the invalid ones were not there
+        valid = [record for i, record in enumerate(self.RECORDS) if i not in failed]
+        alone = self.salary.predict_salary_batch(valid)
+        self.assertEqual([result for i, result in enumerate(batch) if i not in failed], alone)
+        self.assertEqual(len({result['log_salary'] for result in alone}), len(alone))
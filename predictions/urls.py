@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, include
 from . import views
 
 app_name = 'predictions'
@@ -13,4 +13,5 @@ urlpatterns = [
     path('degree-mention/', views.degree_mention_view, name='degree_mention'),
     path("remote-work/", views.remote_work_page, name="remote_work"),
     path("salary/", views.salary_prediction_page, name="salary"),    # path('employer-growth/', views.employer_growth_view, name='employer_growth'),  # Removed - now handled by modal
+    path('api/', include('predictions.api.urls')),
 ]
\ No newline at end of file
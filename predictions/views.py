@@ -1,26 +1,77 @@
+from functools import wraps
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from ml_models.predictors.campaign_conversion_predictor import campaign_conversion_predictor
-from ml_models.predictors.remote_work_predictor import predict_remote_work
-from ml_models.predictors.salary_predictor_regression import predict_salary
+from accounts.permissions import job_seeker_required
+from ml_models.executor import run_inference, InferenceQueueFull
 from .forms import (
     CampaignConversionPredictionForm, SalaryPredictionForm, JobTitlePredictionForm, 
     RemoteWorkPredictionForm, DegreePredictionForm, BenefitsPredictionForm, 
     CompanyGrowthPredictionForm, RevenueGrowthPredictionForm, XGBoostGrowthPredictionForm
 )
 from .models import CampaignPrediction
-from ml_models.predictors.campaign_conversion_predictor import campaign_conversion_predictor
-import pickle
-from pathlib import Path
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
 
+# Predictors (and pandas / scikit-learn / XGBoost behind them) are imported inside the
+# views that use them, so URL loading and management commands stay light
 
-@login_required
-def campaign_conversion_view(request):
+
+# Rendering may touch request.user / the session (context processors), which is sync-only ORM work
+async_render = sync_to_async(render)
+
+# Status returned by async views when the inference executor rejects the request
+INFERENCE_BUSY_STATUS = 503
+
+
+def async_login_required(view_func):
+    """login_required for async views (Django 4.2's decorator cannot wrap coroutines)"""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def async_job_seeker_required(view_func):
+    """job_seeker_required for async views; its checks (ORM, messages) run in a thread"""
+    check = sync_to_async(job_seeker_required(lambda request, *args, **kwargs: None))
+
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        denied = await check(request, *args, **kwargs)
+        if denied is not None:
+            return denied
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+async def _run_prediction(request, fn, *args, **kwargs):
+    """
+    Run a predictor call on the inference executor
+    Returns (result, status); result is None and status 503 when the queue is full
+    """
+    try:
+        return await run_inference(fn, *args, **kwargs), 200
+    except InferenceQueueFull:
+        messages.error(request, 'The prediction service is busy. Please try again in a moment.')
+        return None, INFERENCE_BUSY_STATUS
+
+
+def _busy_response(response, status):
+    if status == INFERENCE_BUSY_STATUS:
+        response.status_code = status
+        response['Retry-After'] = '1'
+    return response
+
+
+@async_login_required
+async def campaign_conversion_view(request):
     """View for marketing campaign conversion predictions"""
     prediction_result = None
+    status = 200
     
     if request.method == 'POST':
         form = CampaignConversionPredictionForm(request.POST)
@@ -38,13 +89,18 @@ def campaign_conversion_view(request):
                 'customer_segment': form.cleaned_data['customer_segment'],
             }
             
-            # Make prediction
-            prediction_result = campaign_conversion_predictor.predict(input_data)
+            # Make prediction (off the event loop)
+            from ml_models.predictors.campaign_conversion_predictor import campaign_conversion_predictor
+            prediction_result, status = await _run_prediction(
+                request, campaign_conversion_predictor.predict, input_data
+            )
             
             # Save prediction if successful
-            if prediction_result.get('success'):
+            if prediction_result is None:
+                pass
+            elif prediction_result.get('success'):
                 try:
-                    CampaignPrediction.objects.create(
+                    await sync_to_async(CampaignPrediction.objects.create)(
                         user=request.user,
                         company=input_data['company'],
                         campaign_type=input_data['campaign_type'],
@@ -80,7 +136,8 @@ def campaign_conversion_view(request):
         'previous_predictions': previous_predictions,
     }
     
-    return render(request, 'predictions/campaign_prediction.html', context)
+    response = await async_render(request, 'predictions/campaign_prediction.html', context)
+    return _busy_response(response, status)
 
 
 @login_required
@@ -89,12 +146,13 @@ def employer_predictions_view(request):
     return render(request, 'predictions/employersPredictions.html')
 
 
-def degree_mention_view(request):
+async def degree_mention_view(request):
     """
     Dedicated view for degree mention prediction ONLY
     Uses xgb_classifier_model(jojo).pkl
     """
     context = {}
+    status = 200
     
     if request.method == 'POST':
         # Get form data
@@ -110,11 +168,13 @@ def degree_mention_view(request):
         # Import and use the degree mention predictor
         from ml_models.predictors.degree_mention_predictor import degree_mention_predictor
         
-        # Make prediction
-        result = degree_mention_predictor.predict(input_data)
+        # Make prediction (off the event loop)
+        result, status = await _run_prediction(request, degree_mention_predictor.predict, input_data)
         
         # Add result to context
-        if result.get('success'):
+        if result is None:
+            pass
+        elif result.get('success'):
             context['result'] = result
             messages.success(request, f"Prediction: {result['prediction']}")
         else:
@@ -123,12 +183,22 @@ def degree_mention_view(request):
         # Keep form data for display
         context['form_data'] = input_data
     
-    return render(request, 'predictions/degree_mention.html', context)
+    response = await async_render(request, 'predictions/degree_mention.html', context)
+    return _busy_response(response, status)
 
 
-@login_required
-def job_seeker_predictions_view(request):
+def _jobseeker_skills(user):
+    """(skill names, years of experience) from the user's job seeker profile, or None without one"""
+    if not hasattr(user, 'jobseeker_profile'):
+        return None
+    profile = user.jobseeker_profile
+    return [skill.name for skill in profile.skills.all()], profile.years_experience
+
+
+@async_login_required
+async def job_seeker_predictions_view(request):
     """View for job seeker predictions including degree requirement prediction"""
+    status = 200
     
     print("=" * 80)
     print(f"VIEW CALLED: Method={request.method}, User={request.user.username}, Authenticated={request.user.is_authenticated}")
@@ -155,14 +225,14 @@ def job_seeker_predictions_view(request):
             
             print(f"DEBUG: Job title prediction requested")
             
-            # Get user's skills from profile
-            if hasattr(request.user, 'jobseeker_profile'):
-                profile = request.user.jobseeker_profile
-                skills = profile.skills.all()
+            # Get user's skills from profile (ORM reads, off the event loop)
+            profile_skills = await sync_to_async(_jobseeker_skills)(request.user)
+            if profile_skills is not None:
+                skills_list, years_experience = profile_skills
                 
-                print(f"DEBUG: Found jobseeker profile with {skills.count()} skills")
+                print(f"DEBUG: Found jobseeker profile with {len(skills_list)} skills")
                 
-                if skills.count() == 0:
+                if not skills_list:
                     # No skills in profile - redirect to profile page
                     messages.warning(
                         request, 
@@ -171,21 +241,19 @@ def job_seeker_predictions_view(request):
                     context['show_job_title_modal'] = True
                     context['no_skills'] = True
                 else:
-                    # Get skill names as list
-                    skills_list = [skill.name for skill in skills]
-                    
-                    # Get years of experience for seniority detection
-                    years_experience = profile.years_experience
-                    
                     print(f"DEBUG: Skills list: {skills_list}")
                     print(f"DEBUG: Years of experience: {years_experience}")
                     
-                    # Make prediction with years of experience
-                    result = job_title_predictor.predict(skills_list, years_of_experience=years_experience)
+                    # Make prediction with years of experience (off the event loop)
+                    result, status = await _run_prediction(
+                        request, job_title_predictor.predict, skills_list, years_of_experience=years_experience
+                    )
                     
                     print(f"DEBUG: Prediction result: {result}")
                     
-                    if result.get('success'):
+                    if result is None:
+                        pass
+                    elif result.get('success'):
                         context['job_title_result'] = result
                         messages.success(
                             request, 
@@ -219,12 +287,14 @@ def job_seeker_predictions_view(request):
                     'search_location': degree_form.cleaned_data['search_location'],
                 }
                 
-                # Use degree mention predictor
+                # Use degree mention predictor (off the event loop)
                 from ml_models.predictors.degree_mention_predictor import degree_mention_predictor
-                result = degree_mention_predictor.predict(input_data)
+                result, status = await _run_prediction(request, degree_mention_predictor.predict, input_data)
                 
                 # Add result to context
-                if result.get('success'):
+                if result is None:
+                    pass
+                elif result.get('success'):
                     context['degree_result'] = result
                     messages.success(request, f"Prediction complete: {result['prediction']}")
                 else:
@@ -239,11 +309,13 @@ def job_seeker_predictions_view(request):
         # Handle other prediction types here (salary, job_title, etc.)
         # TODO: Add handlers for other prediction types
     
-    return render(request, 'predictions/jobSeekersPredictions.html', context)
+    response = await async_render(request, 'predictions/jobSeekersPredictions.html', context)
+    return _busy_response(response, status)
 
 
-def employer_predictions_view(request):
+async def employer_predictions_view(request):
     """View for employer predictions"""
+    status = 200
     context = {
         'company_growth_form': CompanyGrowthPredictionForm(),
         'revenue_growth_form': RevenueGrowthPredictionForm(),
@@ -276,7 +348,7 @@ def employer_predictions_view(request):
                         'founded': founded_input,
                         'industry': industry_input,
                     }
-                    return render(request, 'predictions/employersPredictions.html', context)
+                    return await async_render(request, 'predictions/employersPredictions.html', context)
                 
                 # Calculate delta if not provided
                 if not delta_workers_input:
@@ -298,10 +370,12 @@ def employer_predictions_view(request):
                 # Import and use the company growth predictor
                 from ml_models.predictors.company_growth_predictor import company_growth_predictor
                 
-                # Make prediction
-                result = company_growth_predictor.predict(input_data)
+                # Make prediction (off the event loop)
+                result, status = await _run_prediction(request, company_growth_predictor.predict, input_data)
                 
-                if result.get('success'):
+                if result is None:
+                    pass
+                elif result.get('success'):
                     context['growth_result'] = result
                     messages.success(request, f"Predicted Growth: {result['growth_percentage_formatted']}")
                     print(f"DEBUG: Prediction successful! Result: {result}")
@@ -342,10 +416,12 @@ def employer_predictions_view(request):
                 # Import and use the XGBoost growth predictor
                 from ml_models.predictors.xgboost_growth_predictor import xgboost_growth_predictor
                 
-                # Make prediction
-                result = xgboost_growth_predictor.predict(input_data)
+                # Make prediction (off the event loop)
+                result, status = await _run_prediction(request, xgboost_growth_predictor.predict, input_data)
                 
-                if result.get('success'):
+                if result is None:
+                    pass
+                elif result.get('success'):
                     context['xgboost_growth_result'] = result
                     messages.success(request, f"Prediction: {result['growth_category']}")
                     print(f"DEBUG: XGBoost prediction successful! Result: {result}")
@@ -365,15 +441,17 @@ def employer_predictions_view(request):
     if 'growth_form_data' in context:
         print(f"DEBUG: growth_form_data value: {context['growth_form_data']}")
     
-    return render(request, 'predictions/employersPredictions.html', context)
+    response = await async_render(request, 'predictions/employersPredictions.html', context)
+    return _busy_response(response, status)
 
 
-def employer_growth_view(request):
+async def employer_growth_view(request):
     """
     Dedicated view for company growth prediction ONLY
     Employers only - uses growth_lgbm_pipeline(jojo).pkl
     """
     context = {}
+    status = 200
     
     if request.method == 'POST':
         # Get form data and convert to proper types
@@ -388,7 +466,7 @@ def employer_growth_view(request):
             # Validate required fields are not empty
             if not all([workers_input, prev_workers_input, revenue_input, delta_workers_input, founded_input]):
                 messages.error(request, 'All required fields must be filled')
-                return render(request, 'predictions/employer_growth.html', context)
+                return await async_render(request, 'predictions/employer_growth.html', context)
             
             input_data = {
                 'workers': float(workers_input),
@@ -400,16 +478,18 @@ def employer_growth_view(request):
             }
         except (ValueError, TypeError) as e:
             messages.error(request, f'Invalid input: Please enter valid numbers. {str(e)}')
-            return render(request, 'predictions/employer_growth.html', context)
+            return await async_render(request, 'predictions/employer_growth.html', context)
         
         # Import and use the company growth predictor
         from ml_models.predictors.company_growth_predictor import company_growth_predictor
         
-        # Make prediction
-        result = company_growth_predictor.predict(input_data)
+        # Make prediction (off the event loop)
+        result, status = await _run_prediction(request, company_growth_predictor.predict, input_data)
         
         # Add result to context
-        if result.get('success'):
+        if result is None:
+            pass
+        elif result.get('success'):
             context['result'] = result
             messages.success(request, f"Predicted Growth: {result['growth_percentage_formatted']}")
         else:
@@ -418,26 +498,34 @@ def employer_growth_view(request):
         # Keep form data for display
         context['form_data'] = input_data
     
-    return render(request, 'predictions/employer_growth.html', context)
+    response = await async_render(request, 'predictions/employer_growth.html', context)
+    return _busy_response(response, status)
 
 from .forms import HealthInsuranceForm
-from ml_models.predictors.health_insurance_predictor import health_insurance_predictor
-from accounts.permissions import job_seeker_required
 
 
-@login_required
-@job_seeker_required
-def health_insurance_view(request):
+@async_login_required
+@async_job_seeker_required
+async def health_insurance_view(request):
     result = None
+    status = 200
 
     if request.method == "POST":
         form = HealthInsuranceForm(request.POST)
         if form.is_valid():
             try:
-                result = health_insurance_predictor.predict(form.cleaned_data)
+                from ml_models.predictors.health_insurance_predictor import health_insurance_predictor
+                # Make prediction (off the event loop)
+                result, status = await _run_prediction(request, health_insurance_predictor.predict, form.cleaned_data)
 
                 # Normalize result so template always works, even if predictor returns a raw value
-                if not isinstance(result, dict):
+                if result is None:
+                    result = {
+                        "error": "The prediction service is busy",
+                        "has_health_insurance_label": None,
+                        "probability_yes": None,
+                    }
+                elif not isinstance(result, dict):
                     result = {
                         "has_health_insurance_label": str(result),
                         "probability_yes": None,
@@ -462,11 +550,15 @@ def health_insurance_view(request):
     else:
         form = HealthInsuranceForm()
 
-    return render(request, "predictions/health_insurance.html", {"form": form, "result": result})
-def remote_work_page(request):
+    response = await async_render(request, "predictions/health_insurance.html", {"form": form, "result": result})
+    return _busy_response(response, status)
+
+
+async def remote_work_page(request):
     result = None
     error = None
     form_data = {}
+    status = 200
 
     if request.method == "POST":
         form_data = {
@@ -480,9 +572,12 @@ def remote_work_page(request):
         form = RemoteWorkPredictionForm(request.POST)
         if form.is_valid():
             print("Form is valid, cleaned data:", form.cleaned_data)
-            out = predict_remote_work(form.cleaned_data)
+            from ml_models.predictors.remote_work_predictor import predict_remote_work
+            out, status = await _run_prediction(request, predict_remote_work, form.cleaned_data)
             print("Prediction output:", out)
-            if out.get("success"):
+            if out is None:
+                error = "The prediction service is busy"
+            elif out.get("success"):
                 result = out
                 messages.success(request, f"Prediction: {out['prediction']} ({out['proba_remote_pct']}%)")
             else:
@@ -495,19 +590,21 @@ def remote_work_page(request):
     else:
         form = RemoteWorkPredictionForm()
 
-    return render(request, "predictions/remote_work.html", {
+    response = await async_render(request, "predictions/remote_work.html", {
         "form": form,
         "result": result,
         "error": error,
         "form_data": form_data,
     })
+    return _busy_response(response, status)
 
 
-@login_required
-def salary_prediction_page(request):
+@async_login_required
+async def salary_prediction_page(request):
     """Salary regression prediction page - accessible to job seekers and employers"""
     result = None
     error = None
+    status = 200
     
     if request.method == "POST":
         form = SalaryPredictionForm(request.POST)
@@ -521,9 +618,12 @@ def salary_prediction_page(request):
                 'company_size': 'Medium',  # Default value
             }
             
-            # Make prediction
-            out = predict_salary(input_data)
-            if out.get('success'):
+            # Make prediction (off the event loop)
+            from ml_models.predictors.salary_predictor_regression import predict_salary
+            out, status = await _run_prediction(request, predict_salary, input_data)
+            if out is None:
+                error = 'The prediction service is busy'
+            elif out.get('success'):
                 result = out
                 messages.success(
                     request,
@@ -537,9 +637,9 @@ def salary_prediction_page(request):
     else:
         form = SalaryPredictionForm()
     
-    return render(request, "predictions/salary.html", {
+    response = await async_render(request, "predictions/salary.html", {
         "form": form,
         "result": result,
         "error": error,
     })
-
+    return _busy_response(response, status)